@@ -1,5 +1,7 @@
 import logging
+import random
 import time
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
@@ -8,6 +10,9 @@ class Executor:
         self.config = config # Full config
         self.exec_config = config.get('execution', {})
         self.mt5 = mt5_client
+        # Async submissions awaiting a fill, keyed by request_id
+        self.pending_orders = {}
+        self._last_trail_ts = 0.0
 
     def execute_signal(self, signal, lot_size):
         """
@@ -17,8 +22,10 @@ class Executor:
         
         # Retry logic for transient errors
         max_retries = 3
+        use_async = self.exec_config.get('async_orders', False)
+        place_order = self.mt5.place_order_market_async if use_async else self.mt5.place_order_market
         for attempt in range(max_retries):
-            result = self.mt5.place_order_market(
+            result = place_order(
                 symbol=signal.symbol,
                 volume=lot_size,
                 side=signal.side,
@@ -33,16 +40,59 @@ class Executor:
             
             if retcode == 10009 or retcode == 10008: # TRADE_RETCODE_DONE or PLACED
                 logger.info(f"Order placed successfully: Ticket {result.get('order')}")
+                if use_async and retcode == 10008:
+                    self.pending_orders[result.get('request_id')] = {
+                        'symbol': signal.symbol,
+                        'order': result.get('order', 0),
+                        'magic': self.exec_config.get('magic', 0),
+                        'submitted': datetime.now(),
+                    }
                 return result
             elif retcode in [10004, 10021]: # REQUOTE, NO_MONEY (maybe wait?)
                 logger.warning(f"Order failed (Transient): {result.get('comment')} Retcode: {retcode}")
-                time.sleep(1)
+                # Exponential backoff with full jitter, floored to avoid bursting
+                retry_base = self.exec_config.get('retry_base', 0.2)
+                delay = random.uniform(0, min(retry_base * (2 ** attempt), 2.0))
+                time.sleep(max(delay, 0.1))
             else:
                 logger.error(f"Order failed (Permanent): {result.get('comment')} Retcode: {retcode}")
                 return None
                 
         return None
 
+    def check_pending_orders(self, timeout_seconds: int = 60) -> list:
+        """
+        Match async submissions against history deals. Returns the fill deals found
+        and drops submissions that stayed unfilled longer than timeout_seconds.
+        """
+        if not self.pending_orders:
+            return []
+
+        now = datetime.now()
+        from_date = min(p['submitted'] for p in self.pending_orders.values()) - timedelta(seconds=5)
+        deals = self.mt5.get_history_deals(from_date, now) or []
+
+        fills = []
+        for request_id, pending in list(self.pending_orders.items()):
+            for deal in deals:
+                if pending['order']:
+                    matched = deal.order == pending['order']
+                else:
+                    matched = (deal.symbol == pending['symbol']
+                               and deal.magic == pending['magic']
+                               and deal.entry == 0) # DEAL_ENTRY_IN
+                if matched:
+                    logger.info(f"Async order filled: Request {request_id} Deal {deal.ticket} @ {deal.price}")
+                    fills.append(deal)
+                    del self.pending_orders[request_id]
+                    break
+            else:
+                if now - pending['submitted'] > timedelta(seconds=timeout_seconds):
+                    logger.warning(f"Async order {request_id} not filled after {timeout_seconds}s. Dropping.")
+                    del self.pending_orders[request_id]
+
+        return fills
+
     def manage_trailing_stops(self, symbol: str):
         """
         Check open positions and update SL if trailing conditions met.
@@ -51,19 +101,44 @@ class Executor:
         if not trailing_config.get('enabled', False):
             return
 
+        # Rate-limit updates regardless of poll frequency
+        now = time.monotonic()
+        if now - self._last_trail_ts < trailing_config.get('min_interval', 5.0):
+            return
+        self._last_trail_ts = now
+
+        # Cheap count first; only pull full position data when something is open
+        if self.mt5.positions_total() == 0:
+            return
+
         positions = self.mt5.get_open_positions(symbol=symbol)
         if not positions:
             return
 
         activation_rr = trailing_config.get('activation_rr', 1.0)
         trailing_dist_rr = trailing_config.get('trailing_dist_rr', 0.5)
+
+        # Symbol properties are the same for every position; fetch once.
+        symbol_info = self.mt5.get_symbol_info(symbol)
+        if symbol_info is None:
+            logger.error(f"Could not get symbol info for {symbol}")
+            return
+        point = symbol_info.point
+        
+        # R logic requires knowing R.
+        # Let's assume R = 500 points (default) * point_value.
+        r_points = 500 
+        r_value = r_points * point
+        
+        activation_dist = r_value * activation_rr
+        trailing_dist = r_value * trailing_dist_rr
         
         for pos in positions:
-            ticket = pos['ticket']
-            entry_price = pos['price_open']
-            current_sl = pos['sl']
-            current_price = pos['price_current']
-            pos_type = pos['type'] # 0=BUY, 1=SELL
+            ticket = pos.ticket
+            entry_price = pos.price_open
+            current_sl = pos.sl
+            current_price = pos.price_current
+            pos_type = pos.type # 0=BUY, 1=SELL
             
             # Calculate R (Risk distance)
             # We need original SL to calculate R. 
@@ -101,18 +176,7 @@ class Executor:
                 # If Profit > X points, Move SL to (CurrentPrice - Y points).
                 pass
             
-            # RE-IMPLEMENTATION with R logic requires knowing R.
-            # Let's assume R = 500 points (default) * point_value.
-            symbol_info = self.mt5.get_symbol_info(symbol)
-            point = symbol_info.point
-            
-            # Default R in points (500)
-            r_points = 500 
-            r_value = r_points * point
-            
-            activation_dist = r_value * activation_rr
-            trailing_dist = r_value * trailing_dist_rr
-            
+            # RE-IMPLEMENTATION with R logic (R and distances computed above the loop).
             if pos_type == 0: # BUY
                 profit = current_price - entry_price
                 if profit >= activation_dist:
@@ -1,74 +1,397 @@
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError: # e.g. MT5 terminals where numba can't be installed
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op stand-in for numba.njit so kernels still import; the lfilter paths are used instead.
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+def _wilder_ema(x: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing (alpha = 1/period, seeded with the SMA of the first `period` values)
+    as a C-level IIR filter. The first period-1 outputs are NaN.
+    """
+    out = np.full(len(x), np.nan)
+    if len(x) < period:
+        return out
+    seed = x[:period].mean()
+    out[period - 1] = seed
+    if len(x) > period:
+        alpha = 1.0 / period
+        out[period:], _ = lfilter([alpha], [1.0, -(1.0 - alpha)], x[period:], zi=[(1.0 - alpha) * seed])
+    return out
+
+@njit(cache=True, fastmath=True)
+def _rsi_wilder(arr, period, out):
+    """
+    Wilder's RSI kernel: seed averages with the SMA of the first `period`
+    changes, then apply avg = (avg * (period - 1) + x) / period.
+    Writes into `out` (pre-filled with NaN) and returns the final (avg_gain, avg_loss).
+    """
+    n = arr.shape[0]
+    if n <= period:
+        return np.nan, np.nan
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        change = arr[i] - arr[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= period
+    avg_loss /= period
+    out[period] = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, 1e-9))
+
+    for i in range(period + 1, n):
+        change = arr[i] - arr[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        out[i] = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, 1e-9))
+    return avg_gain, avg_loss
+
+@njit(cache=True, fastmath=True)
+def _rsi14(arr, out):
+    """
+    _rsi_wilder specialised for period=14: the smoothing divides are folded
+    into multiplications by constants.
+    """
+    INV = 1.0 / 14.0
+    SCALE = 13.0 / 14.0
+    n = arr.shape[0]
+    if n <= 14:
+        return np.nan, np.nan
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, 15):
+        change = arr[i] - arr[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain *= INV
+    avg_loss *= INV
+    out[14] = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, 1e-9))
+
+    for i in range(15, n):
+        change = arr[i] - arr[i - 1]
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        avg_gain = avg_gain * SCALE + gain * INV
+        avg_loss = avg_loss * SCALE + loss * INV
+        out[i] = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, 1e-9))
+    return avg_gain, avg_loss
+
+def _rsi_lfilter(arr: np.ndarray, period: int):
+    """
+    Non-numba RSI: same result as _rsi_wilder, smoothing done by _wilder_ema.
+    Returns (rsi, final avg_gain, final avg_loss).
+    """
+    out = np.full(len(arr), np.nan)
+    if len(arr) <= period:
+        return out, np.nan, np.nan
+    delta = np.diff(arr)
+    avg_gain = _wilder_ema(np.clip(delta, 0, None), period)
+    avg_loss = _wilder_ema(np.clip(-delta, 0, None), period)
+    out[1:] = 100 - (100 / (1 + avg_gain / np.maximum(avg_loss, 1e-9)))
+    return out, avg_gain[-1], avg_loss[-1]
+
+def rsi_np(arr: np.ndarray, period: int = 14, return_state: bool = False):
+    """
+    Wilder's RSI over a float64 array.
+    With return_state=True returns (rsi, (avg_gain, avg_loss)) for streaming updates.
+    """
+    if HAVE_NUMBA:
+        out = np.full(len(arr), np.nan)
+        if period == 14:
+            state = _rsi14(arr, out)
+        else:
+            state = _rsi_wilder(arr, period, out)
+    else:
+        out, avg_gain, avg_loss = _rsi_lfilter(arr, period)
+        state = (avg_gain, avg_loss)
+    return (out, state) if return_state else out
 
 def rsi(series: pd.Series, period: int = 14) -> pd.Series:
     """
-    Calculate RSI using EMA smoothing (Wilder's RSI).
+    Calculate RSI using Wilder's smoothing (SMA-seeded, same as TradingView's ta.rsi).
     """
-    delta = series.diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-    
-    # Use exponential moving average for smoothing
-    ma_up = up.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
-    ma_down = down.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
-    
-    # Avoid division by zero
-    rs = ma_up / ma_down.replace(0, 1e-9)
-    rsi_series = 100 - (100 / (1 + rs))
-    return rsi_series
+    return pd.Series(rsi_np(series.to_numpy(dtype=np.float64, copy=False), period), index=series.index)
+
+@njit(cache=True)
+def _wma_kernel(arr, w, out):
+    """
+    Weighted dot product over each full window; NaN in a window gives NaN.
+    """
+    period = w.shape[0]
+    for i in range(period - 1, arr.shape[0]):
+        acc = 0.0
+        base = i - period + 1
+        for k in range(period):
+            acc += arr[base + k] * w[k]
+        out[i] = acc
+
+def wma_np(arr: np.ndarray, period: int) -> np.ndarray:
+    """
+    Weighted Moving Average over a float64 array (newest bar weighted `period`).
+    """
+    w = np.arange(1, period + 1, dtype=np.float64)
+    w /= w.sum()
+    out = np.full(len(arr), np.nan)
+    if len(arr) < period:
+        return out
+    if HAVE_NUMBA:
+        _wma_kernel(arr, w, out)
+    else:
+        # Reversed kernel so the newest bar gets the largest weight
+        out[period - 1:] = np.convolve(arr, w[::-1], mode='valid')
+    return out
 
 def wma(series: pd.Series, period: int) -> pd.Series:
     """
     Calculate Weighted Moving Average.
     """
-    weights = np.arange(1, period + 1)
-    
-    def calc(x):
-        return np.dot(x, weights) / weights.sum()
-        
-    return series.rolling(period).apply(calc, raw=True)
+    return pd.Series(wma_np(series.to_numpy(dtype=np.float64, copy=False), period), index=series.index)
+
+@njit(cache=True)
+def _ema_kernel(arr, alpha, out):
+    """
+    EMA recurrence y = alpha*x + (1-alpha)*y_prev, seeded at the first non-NaN
+    value (same as pandas ewm(adjust=False)). NaN inputs hold the previous value.
+    """
+    n = arr.shape[0]
+    start = 0
+    while start < n and np.isnan(arr[start]):
+        start += 1
+    if start == n:
+        return
+    y = arr[start]
+    out[start] = y
+    for i in range(start + 1, n):
+        x = arr[i]
+        if not np.isnan(x):
+            y = alpha * x + (1.0 - alpha) * y
+        out[i] = y
+
+def ema_np(arr: np.ndarray, period: int) -> np.ndarray:
+    """
+    Exponential Moving Average (alpha = 2/(period+1)) over a float64 array.
+    """
+    alpha = 2.0 / (period + 1)
+    out = np.full(len(arr), np.nan)
+    if HAVE_NUMBA:
+        _ema_kernel(arr, alpha, out)
+        return out
+    valid = np.flatnonzero(~np.isnan(arr))
+    if len(valid) == 0:
+        return out
+    start = valid[0]
+    out[start] = arr[start]
+    if len(arr) > start + 1:
+        out[start + 1:], _ = lfilter([alpha], [1.0, -(1.0 - alpha)], arr[start + 1:], zi=[(1.0 - alpha) * arr[start]])
+    return out
 
 def ema(series: pd.Series, period: int) -> pd.Series:
     """
     Calculate Exponential Moving Average.
     """
-    return series.ewm(span=period, adjust=False).mean()
+    return pd.Series(ema_np(series.to_numpy(dtype=np.float64, copy=False), period), index=series.index)
 
-def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+@njit(cache=True)
+def _rsi_wma_ema_kernel(arr, period, w, alpha, rsi, wma, ema):
     """
-    Calculate Average Directional Index (ADX).
+    RSI, WMA(RSI) and EMA(RSI) in one pass over close: each bar's RSI feeds the
+    EMA recurrence and the WMA window straight away. Same results as _rsi_wilder,
+    _wma_kernel and _ema_kernel run in sequence. Outputs are pre-filled with NaN.
+    Returns the final (avg_gain, avg_loss).
     """
+    n = arr.shape[0]
+    if n <= period:
+        return np.nan, np.nan
+    wp = w.shape[0]
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        change = arr[i] - arr[i - 1]
+        if change > 0:
+            avg_gain += change
+        else:
+            avg_loss -= change
+    avg_gain /= period
+    avg_loss /= period
+
+    y = 0.0
+    for i in range(period, n):
+        if i > period:
+            change = arr[i] - arr[i - 1]
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        r = 100.0 - 100.0 / (1.0 + avg_gain / max(avg_loss, 1e-9))
+        rsi[i] = r
+
+        # EMA seeded at the first RSI value
+        y = r if i == period else alpha * r + (1.0 - alpha) * y
+        ema[i] = y
+
+        # WMA once a full window of RSI values exists
+        base = i - wp + 1
+        if base >= period:
+            acc = 0.0
+            for k in range(wp):
+                acc += rsi[base + k] * w[k]
+            wma[i] = acc
+    return avg_gain, avg_loss
+
+def rsi_wma_ema_bundle(close: np.ndarray, rsi_period: int, wma_period: int, ema_period: int, return_state: bool = False):
+    """
+    (rsi, rsi_wma, rsi_ema) over a float64 close array, computed in one fused pass when numba is available.
+    With return_state=True returns ((rsi, rsi_wma, rsi_ema), (avg_gain, avg_loss)).
+    """
+    if HAVE_NUMBA:
+        n = len(close)
+        rsi_out = np.full(n, np.nan)
+        wma_out = np.full(n, np.nan)
+        ema_out = np.full(n, np.nan)
+        w = np.arange(1, wma_period + 1, dtype=np.float64)
+        w /= w.sum()
+        state = _rsi_wma_ema_kernel(close, rsi_period, w, 2.0 / (ema_period + 1), rsi_out, wma_out, ema_out)
+    else:
+        rsi_out, state = rsi_np(close, rsi_period, return_state=True)
+        wma_out = wma_np(rsi_out, wma_period)
+        ema_out = ema_np(rsi_out, ema_period)
+    bundle = (rsi_out, wma_out, ema_out)
+    return (bundle, state) if return_state else bundle
+
+@njit(cache=True, fastmath=True)
+def _adx(h, l, c, period, out):
+    """
+    Wilder's ADX kernel. One pass over OHLC computing TR/+DM/-DM, Wilder sums,
+    DI, DX and the smoothed ADX. First ADX lands at index 2*period - 1.
+    Writes into `out` (pre-filled with NaN) and returns the final (trs, pdms, mdms, adx).
+    """
+    n = h.shape[0]
+    trs = 0.0
+    pdms = 0.0
+    mdms = 0.0
+    dx_sum = 0.0
+    adx_val = 0.0
+
+    for i in range(1, n):
+        # 1. True Range and Directional Movement
+        tr = max(h[i] - l[i], abs(h[i] - c[i - 1]), abs(l[i] - c[i - 1]))
+        up_move = h[i] - h[i - 1]
+        down_move = l[i - 1] - l[i]
+        pdm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        mdm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        # 2. Wilder sums (seeded with plain sums over the first period bars)
+        if i <= period:
+            trs += tr
+            pdms += pdm
+            mdms += mdm
+            if i < period:
+                continue
+        else:
+            trs = trs - trs / period + tr
+            pdms = pdms - pdms / period + pdm
+            mdms = mdms - mdms / period + mdm
+
+        # 3. DI and DX
+        tr_safe = max(trs, 1e-9)
+        plus_di = 100.0 * pdms / tr_safe
+        minus_di = 100.0 * mdms / tr_safe
+        dx = 100.0 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
+
+        # 4. ADX: SMA of the first period DX values, then Wilder smoothing
+        k = i - period
+        if k < period - 1:
+            dx_sum += dx
+        elif k == period - 1:
+            adx_val = (dx_sum + dx) / period
+            out[i] = adx_val
+        else:
+            adx_val = (adx_val * (period - 1) + dx) / period
+            out[i] = adx_val
+    return trs, pdms, mdms, adx_val
+
+def _adx_lfilter(h: np.ndarray, l: np.ndarray, c: np.ndarray, period: int):
+    """
+    Non-numba ADX: same result as _adx, smoothing done by _wilder_ema.
+    Returns (adx, (trs, pdms, mdms, adx)) with the final Wilder sums.
+    """
+    out = np.full(len(h), np.nan)
+    if len(h) < 2:
+        return out, (0.0, 0.0, 0.0, 0.0)
+
     # 1. Calculate True Range (TR)
-    tr1 = high - low
-    tr2 = (high - close.shift(1)).abs()
-    tr3 = (low - close.shift(1)).abs()
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    # Bar 0 (no previous close) is dropped before smoothing.
+    tr = np.empty_like(h)
+    tr[0] = np.nan
+    tr[1:] = np.maximum.reduce([h[1:] - l[1:], np.abs(h[1:] - c[:-1]), np.abs(l[1:] - c[:-1])])
     
     # 2. Calculate Directional Movement (+DM, -DM)
-    up_move = high - high.shift(1)
-    down_move = low.shift(1) - low
+    up_move = np.empty_like(h)
+    up_move[0] = np.nan
+    up_move[1:] = h[1:] - h[:-1]
+    down_move = np.empty_like(l)
+    down_move[0] = np.nan
+    down_move[1:] = l[:-1] - l[1:]
     
     plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
     minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
     
-    plus_dm = pd.Series(plus_dm, index=high.index)
-    minus_dm = pd.Series(minus_dm, index=high.index)
-    
-    # 3. Smooth TR, +DM, -DM (Wilder's Smoothing: alpha=1/period)
-    # Note: Wilder's smoothing is equivalent to EMA with alpha=1/period
-    tr_smooth = tr.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
-    plus_dm_smooth = plus_dm.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
-    minus_dm_smooth = minus_dm.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
+    # 3. Smooth TR, +DM, -DM from bar 1 (bar 0 has no previous close)
+    tr_smooth = _wilder_ema(tr[1:], period)
+    plus_dm_smooth = _wilder_ema(plus_dm[1:], period)
+    minus_dm_smooth = _wilder_ema(minus_dm[1:], period)
     
     # 4. Calculate +DI, -DI
-    plus_di = 100 * (plus_dm_smooth / tr_smooth.replace(0, 1e-9))
-    minus_di = 100 * (minus_dm_smooth / tr_smooth.replace(0, 1e-9))
+    plus_di = 100 * (plus_dm_smooth / np.maximum(tr_smooth, 1e-9))
+    minus_di = 100 * (minus_dm_smooth / np.maximum(tr_smooth, 1e-9))
     
-    # 5. Calculate DX
-    dx = 100 * (abs(plus_di - minus_di) / (plus_di + minus_di).replace(0, 1e-9))
+    # 5. Calculate DX (first valid at bar `period`)
+    dx = 100 * (np.abs(plus_di - minus_di) / np.maximum(plus_di + minus_di, 1e-9))
     
     # 6. Calculate ADX (Smoothed DX)
-    adx_series = dx.ewm(alpha=1/period, min_periods=period, adjust=False).mean()
-    
-    return adx_series
+    if len(dx) >= period:
+        out[period:] = _wilder_ema(dx[period - 1:], period)
+    state = (tr_smooth[-1] * period, plus_dm_smooth[-1] * period, minus_dm_smooth[-1] * period, out[-1])
+    return out, state
+
+def adx_np(h: np.ndarray, l: np.ndarray, c: np.ndarray, period: int = 14, return_state: bool = False):
+    """
+    Wilder's ADX over float64 high/low/close arrays.
+    With return_state=True returns (adx, (trs, pdms, mdms, adx)) for streaming updates.
+    """
+    if HAVE_NUMBA:
+        out = np.full(len(h), np.nan)
+        state = _adx(h, l, c, period, out)
+    else:
+        out, state = _adx_lfilter(h, l, c, period)
+    return (out, state) if return_state else out
+
+def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """
+    Calculate Average Directional Index (ADX).
+    """
+    h = high.to_numpy(dtype=np.float64, copy=False)
+    l = low.to_numpy(dtype=np.float64, copy=False)
+    c = close.to_numpy(dtype=np.float64, copy=False)
+    return pd.Series(adx_np(h, l, c, period), index=high.index)
@@ -1,6 +1,7 @@
 import time
 import yaml
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from mt5_client import MT5Client
 from indicators import rsi, wma, ema
 from signal_engine import SignalEngine
@@ -9,6 +10,18 @@ from executor import Executor
 from monitor import Monitor
 from news_filter import NewsFilter
 
+# Length of each timeframe in seconds (MN1 has no fixed length)
+TF_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+    "W1": 604800,
+}
+
 def load_config(path="config.yaml"):
     with open(path, "r") as f:
         return yaml.safe_load(f)
@@ -35,6 +48,7 @@ def main():
     tf3 = config['strategy']['tf3']
     tf2 = config['strategy']['tf2']
     tf1 = config['strategy']['tf1']
+    tf1_seconds = TF_SECONDS.get(tf1)
     
     logger = logging.getLogger(__name__)
     logger.info(f"Bot started for {symbol}. TFs: {tf3}, {tf2}, {tf1}")
@@ -45,34 +59,56 @@ def main():
     
     monitor.send_alert(f"Bot started for {symbol}. Balance: {initial_balance}")
 
-    from datetime import datetime, timedelta
+    from datetime import datetime
 
     # Initial Risk Sync
     risk_manager.sync_daily_stats()
     
     last_tf1_close_time = None
-    last_summary_time = datetime.now()
-    last_risk_sync_time = datetime.now()
-    last_heartbeat_time = datetime.now()
+
+    # Periodic tasks run off monotonic deadlines (immune to wall-clock adjustments)
+    SUMMARY_INTERVAL = 4 * 3600
+    HEARTBEAT_INTERVAL = 3600
+    RISK_SYNC_INTERVAL = 10 * 60
+    start = time.monotonic()
+    next_summary = start + SUMMARY_INTERVAL
+    next_heartbeat = start + HEARTBEAT_INTERVAL
+    next_risk_sync = start + RISK_SYNC_INTERVAL
+
+    # Config values and client methods used on every poll, resolved once
+    news_enabled = config.get('news_filter', {}).get('enabled', False)
+    filters_cfg = config.get('filters', {})
+    start_hour = filters_cfg.get('start_hour', 0)
+    end_hour = filters_cfg.get('end_hour', 24)
+    max_spread = filters_cfg.get('max_spread', 1000)
+    poll_interval = config['monitor']['poll_interval']
+    _get_tick = mt5.get_tick
+    _get_syminfo = mt5.get_symbol_info
+    _get_candles = mt5.get_candles
+
+    # Candle fetches for the three TFs are issued concurrently to overlap terminal round trips
+    candle_pool = ThreadPoolExecutor(max_workers=3)
 
     try:
         while True:
+            now_mono = time.monotonic()
+
             # Check for 4-hour Summary
-            if datetime.now() - last_summary_time > timedelta(hours=4):
+            if now_mono >= next_summary:
                 monitor.send_summary(hours=4)
-                last_summary_time = datetime.now()
+                next_summary = now_mono + SUMMARY_INTERVAL
                 
             # Check for 1-hour Heartbeat
-            if datetime.now() - last_heartbeat_time > timedelta(hours=1):
+            if now_mono >= next_heartbeat:
                 account_info = mt5.get_account_info()
                 balance = account_info.get('balance', 0.0)
                 monitor.send_heartbeat(balance)
-                last_heartbeat_time = datetime.now()
+                next_heartbeat = now_mono + HEARTBEAT_INTERVAL
                 
             # Periodic Risk Sync (e.g., every 10 minutes)
-            if datetime.now() - last_risk_sync_time > timedelta(minutes=10):
+            if now_mono >= next_risk_sync:
                 risk_manager.sync_daily_stats()
-                last_risk_sync_time = datetime.now()
+                next_risk_sync = now_mono + RISK_SYNC_INTERVAL
 
             # Check Circuit Breaker
             # Ensure connection first
@@ -87,11 +123,16 @@ def main():
                 time.sleep(5)
                 continue
                 
-            if not risk_manager.check_safety(account_info.get('balance', 0)):
+            # Risk limits for this balance, reused by lot sizing below
+            budget = risk_manager.risk_budget(account_info.get('balance', 0))
+            if not budget.ok:
                 logger.warning("Risk safety check failed. Stopping trading.")
                 monitor.send_alert("Risk safety check failed. Bot stopped.")
                 break
                 
+            # Pick up fills of async order submissions
+            executor.check_pending_orders()
+
             # --- TRAILING STOP MANAGEMENT ---
             executor.manage_trailing_stops(symbol)
             # --------------------------------
@@ -99,23 +140,18 @@ def main():
             # 1. Fetch Candles
             # Fetch enough candles for WMA45 (need at least 45+buffer)
             n_candles = 200 
-            df3 = mt5.get_candles(symbol, tf3, n_candles)
-            df2 = mt5.get_candles(symbol, tf2, n_candles)
-            df1 = mt5.get_candles(symbol, tf1, n_candles)
+            futures = [candle_pool.submit(_get_candles, symbol, tf, n_candles) for tf in (tf3, tf2, tf1)]
+            df3, df2, df1 = [f.result() for f in futures]
 
-            if df3.empty or df2.empty or df1.empty:
+            if len(df3) == 0 or len(df2) == 0 or len(df1) < 2:
                 logger.warning("Failed to fetch data. Retrying...")
                 time.sleep(5)
                 continue
 
-            # 2. Compute Indicators
-            df3 = signal_engine.compute_indicators(df3)
-            df2 = signal_engine.compute_indicators(df2)
-            df1 = signal_engine.compute_indicators(df1)
-
-            # 3. Check for New Candle (TF1)
+            # 2. Check for New Candle (TF1)
             # We only trade on closed candles of TF1
-            current_tf1_close_time = df1.iloc[-1]['time'] # Assuming get_candles returns latest open/closed? 
+            t1 = df1['time'].to_numpy() # one array view instead of row-then-column lookups
+            current_tf1_close_time = t1[-1] # Assuming get_candles returns latest open/closed? 
             # Usually get_candles(..., n) returns latest n candles. The last one might be open.
             # If we want closed candles, we should look at iloc[-2] as the last CLOSED candle.
             # Or we check if a NEW candle has appeared.
@@ -123,7 +159,7 @@ def main():
             # If df1.iloc[-2]['time'] > last_processed_time, then we have a new closed candle.
             
             # Let's use iloc[-2] as the "Signal Candle".
-            signal_candle_time = df1.iloc[-2]['time']
+            signal_candle_time = t1[-2]
             
             if last_tf1_close_time is None:
                 last_tf1_close_time = signal_candle_time
@@ -134,6 +170,9 @@ def main():
                 # New candle closed!
                 logger.info(f"New candle closed at {signal_candle_time}. Analyzing...")
                 
+                # Symbol info fetched once per new candle; reused for spread check and fixed SL point
+                symbol_info = _get_syminfo(symbol)
+
                 # Check for existing positions
                 open_positions = mt5.get_open_positions(symbol=symbol)
                 if open_positions:
@@ -143,7 +182,7 @@ def main():
 
                 # --- FILTERS ---
                 # 0. News Filter
-                if config.get('news_filter', {}).get('enabled', False):
+                if news_enabled:
                     is_news, event_title, mins = news_filter.is_news_imminent(symbol)
                     if is_news:
                         logger.warning(f"News Imminent: {event_title} ({mins:.1f} min). Pausing trading.")
@@ -153,8 +192,6 @@ def main():
 
                 # 1. Time Filter
                 current_hour = datetime.now().hour
-                start_hour = config.get('filters', {}).get('start_hour', 0)
-                end_hour = config.get('filters', {}).get('end_hour', 24)
                 
                 if not (start_hour <= current_hour < end_hour):
                     logger.info(f"Outside trading hours ({current_hour}:00). Allowed: {start_hour}-{end_hour}. Skipping.")
@@ -162,15 +199,13 @@ def main():
                     continue
 
                 # 2. Spread Filter
-                tick = mt5.get_tick(symbol)
-                if tick:
-                    spread = tick['ask'] - tick['bid']
+                tick = _get_tick(symbol)
+                if tick is not None:
+                    spread = tick.ask - tick.bid
                     # Convert to points
-                    symbol_info = mt5.get_symbol_info(symbol)
                     point = symbol_info.point if symbol_info else 0.00001
                     spread_points = spread / point
                     
-                    max_spread = config.get('filters', {}).get('max_spread', 1000)
                     if spread_points > max_spread:
                         logger.warning(f"Spread too high ({spread_points:.1f} > {max_spread}). Skipping.")
                         last_tf1_close_time = signal_candle_time
@@ -196,12 +231,16 @@ def main():
                 # To make signal_engine logic work (which uses -1 and -2), we can pass `df.iloc[:-1]` (exclude forming candle).
                 # Then -1 becomes the closed candle, -2 becomes the one before it.
                 
-                df3_closed = df3.iloc[:-1]
-                df2_closed = df2.iloc[:-1]
-                df1_closed = df1.iloc[:-1]
+                # 3. Compute Indicators
+                # Only done here, once per closed TF1 candle; polls in between do no indicator work.
+                # Indicators are computed on the closed bars only, keyed per (symbol, TF), so the
+                # engine carries the Wilder/EMA/WMA state forward and only computes bars that
+                # closed since the last call instead of a full pass over the window.
+                df3_closed = signal_engine.compute_indicators(df3.iloc[:-1].copy(deep=False), key=(symbol, tf3))
+                df2_closed = signal_engine.compute_indicators(df2.iloc[:-1].copy(deep=False), key=(symbol, tf2))
+                df1_closed = signal_engine.compute_indicators(df1.iloc[:-1].copy(deep=False), key=(symbol, tf1))
                 
                 # Get symbol point for Fixed SL calculation
-                symbol_info = mt5.get_symbol_info(symbol)
                 point = symbol_info.point if symbol_info else None
                 
                 signal = signal_engine.generate(df3_closed, df2_closed, df1_closed, symbol, point=point)
@@ -210,8 +249,7 @@ def main():
                     logger.info(f"Signal Generated: {signal}")
                     
                     # Risk Sizing
-                    balance = account_info.get('balance', 0)
-                    lot_size = risk_manager.compute_lot_size(symbol, signal.sl_price, signal.entry_price, balance)
+                    lot_size = risk_manager.compute_lot_size(symbol, signal.sl_price, signal.entry_price, budget=budget)
                     
                     if lot_size > 0:
                         # Execute
@@ -225,7 +263,14 @@ def main():
                 last_tf1_close_time = signal_candle_time
 
             # Sleep
-            time.sleep(config['monitor']['poll_interval'])
+            # Wake up just after the next TF1 close if it comes before the next regular poll.
+            # Bar boundaries are taken from the epoch clock: candle times are broker server time,
+            # which lines up with it as long as the broker offset is a whole number of TF1 periods.
+            if tf1_seconds:
+                until_close = tf1_seconds - (time.time() % tf1_seconds) + 1.0
+                time.sleep(min(poll_interval, max(1.0, until_close)))
+            else:
+                time.sleep(poll_interval)
 
     except KeyboardInterrupt:
         logger.info("Stopping bot...")
@@ -233,7 +278,10 @@ def main():
         logger.error(f"Fatal error: {e}", exc_info=True)
         monitor.send_alert(f"Bot crashed: {e}")
     finally:
+        candle_pool.shutdown(wait=False)
         mt5.shutdown()
+        # Let queued alerts (e.g. the crash alert) go out before exiting
+        monitor.flush()
 
 if __name__ == "__main__":
     main()
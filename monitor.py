@@ -1,16 +1,61 @@
+import asyncio
+import concurrent.futures
 import logging
+import threading
 import time
-import requests
+from collections import deque
+import httpx
+import numpy as np
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Telegram message templates (Markdown)
+ALERT_TMPL = "⚠️ *ALERT*\n{message}"
+
+TRADE_TMPL = (
+    "🚀 *TRADE EXECUTED*\n"
+    "Symbol: *{symbol}*\n"
+    "Side: *{side}*\n"
+    "Lot: *{lot_size}*\n"
+    "Price: *{price}*\n"
+    "SL: {sl}\n"
+    "TP: {tp}\n"
+    "Ticket: `{ticket}`\n"
+    "Reason: {reason}"
+)
+
+SUMMARY_TMPL = (
+    "📊 *SUMMARY ({hours}h)*\n"
+    "Time: {time:%Y-%m-%d %H:%M}\n"
+    "Deals: {total_deals}\n"
+    "Win/Loss: {winning_deals}/{losing_deals}\n"
+    "Total P&L: *{total_profit:.2f}*"
+)
+
+HEARTBEAT_TMPL = "💓 *Heartbeat*\nBot is alive.\nBalance: *${balance:.2f}*"
+
 class Monitor:
     def __init__(self, config, mt5_client):
         self.config = config
         self.mt5 = mt5_client
         self.setup_logging()
 
+        # Telegram sends run on a background asyncio loop over one HTTP/2 connection,
+        # so the trading loop never waits on the network and bursts are multiplexed.
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="telegram-sender", daemon=True)
+        self._loop_thread.start()
+        asyncio.run_coroutine_threadsafe(self._open_client(), self._loop).result()
+        self._pending = deque()
+        self._max_pending = config.get('telegram_queue_size', 100)
+
+        # (from_minute, to_minute) -> (monotonic time, stats tuple)
+        self._summary_cache = {}
+        self._summary_cache_ttl = 30
+        # Highest deal ticket already counted in a summary
+        self._last_seen_deal_ticket = 0
+
     def setup_logging(self):
         logging.basicConfig(
             level=logging.INFO,
@@ -21,9 +66,23 @@ class Monitor:
             ]
         )
 
+    async def _open_client(self):
+        # Created on the sender loop so the client and semaphore bind to it
+        self._client = httpx.AsyncClient(http2=True, timeout=10)
+        self._send_slots = asyncio.Semaphore(4) # max in-flight requests
+
+    async def _post(self, url, data):
+        async with self._send_slots:
+            try:
+                response = await self._client.post(url, data=data)
+                if response.status_code != 200:
+                    logger.error(f"Failed to send Telegram message: {response.text}")
+            except Exception as e:
+                logger.error(f"Exception sending Telegram message: {e}")
+
     def send_telegram_message(self, message):
         """
-        Send message to Telegram.
+        Schedule message for sending to Telegram. Drops the oldest pending message if too many are queued.
         """
         token = self.config.get('telegram_bot_token')
         chat_id = self.config.get('telegram_chat_id')
@@ -35,96 +94,94 @@ class Monitor:
         url = f"https://api.telegram.org/bot{token}/sendMessage"
         data = {"chat_id": chat_id, "text": message, "parse_mode": "Markdown"}
         
-        try:
-            response = requests.post(url, data=data, timeout=10)
-            if response.status_code != 200:
-                logger.error(f"Failed to send Telegram message: {response.text}")
-        except Exception as e:
-            logger.error(f"Exception sending Telegram message: {e}")
+        self._pending = deque(f for f in self._pending if not f.done())
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft().cancel()
+            logger.warning("Telegram queue full. Dropped oldest message.")
+        self._pending.append(asyncio.run_coroutine_threadsafe(self._post(url, data), self._loop))
+
+    def flush(self, timeout=10):
+        """
+        Wait up to timeout seconds for pending Telegram messages to be sent.
+        """
+        if self._pending:
+            concurrent.futures.wait(list(self._pending), timeout=timeout)
 
     def send_alert(self, message):
         """
         Send general alert to Telegram.
         """
         logger.info(f"ALERT: {message}")
-        self.send_telegram_message(f"⚠️ *ALERT*\n{message}")
+        self.send_telegram_message(ALERT_TMPL.format_map({'message': message}))
 
     def send_trade_notification(self, signal, lot_size, result):
         """
         Send trade execution notification.
         """
-        symbol = signal.symbol
-        side = signal.side
-        price = result.get('price', signal.entry_price)
-        sl = signal.sl_price
-        tp = signal.tp_price
-        ticket = result.get('order', 'Unknown')
-        
-        msg = (
-            f"🚀 *TRADE EXECUTED*\n"
-            f"Symbol: *{symbol}*\n"
-            f"Side: *{side}*\n"
-            f"Lot: *{lot_size}*\n"
-            f"Price: *{price}*\n"
-            f"SL: {sl}\n"
-            f"TP: {tp}\n"
-            f"Ticket: `{ticket}`\n"
-            f"Reason: {signal.reason}"
-        )
+        msg = TRADE_TMPL.format_map({
+            'symbol': signal.symbol,
+            'side': signal.side,
+            'lot_size': lot_size,
+            'price': result.get('price', signal.entry_price),
+            'sl': signal.sl_price,
+            'tp': signal.tp_price,
+            'ticket': result.get('order', 'Unknown'),
+            'reason': signal.reason,
+        })
         self.send_telegram_message(msg)
 
     def send_summary(self, hours=4):
         """
         Send P&L summary for the last n hours.
+        Deals already counted in a previous summary are skipped.
         """
         to_date = datetime.now()
         from_date = to_date - timedelta(hours=hours)
         
-        deals = self.mt5.get_history_deals(from_date, to_date)
-        
-        total_profit = 0.0
-        total_deals = 0
-        winning_deals = 0
-        losing_deals = 0
-        
-        # Filter for entry/exit deals (exclude balance operations if possible, though history_deals usually includes them)
-        # Entry deals usually have profit=0. Exit deals have profit.
-        # We sum up profit.
-        
-        for deal in deals:
-            # deal_type = deal.get('type') # 0=BUY, 1=SELL, 2=BALANCE
-            # entry = deal.get('entry') # 0=IN, 1=OUT, 2=INOUT, 3=OUT_BY
-            
-            profit = deal.get('profit', 0.0)
-            swap = deal.get('swap', 0.0)
-            commission = deal.get('commission', 0.0)
-            net_profit = profit + swap + commission
-            
-            # Only count deals that affect P&L (usually exits)
-            if net_profit != 0:
-                total_profit += net_profit
-                total_deals += 1
-                if net_profit > 0:
-                    winning_deals += 1
-                else:
-                    losing_deals += 1
-                    
-        msg = (
-            f"📊 *SUMMARY ({hours}h)*\n"
-            f"Time: {to_date.strftime('%Y-%m-%d %H:%M')}\n"
-            f"Deals: {total_deals}\n"
-            f"Win/Loss: {winning_deals}/{losing_deals}\n"
-            f"Total P&L: *{total_profit:.2f}*"
-        )
+        key = (from_date.replace(second=0, microsecond=0), to_date.replace(second=0, microsecond=0))
+        cached = self._summary_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._summary_cache_ttl:
+            total_profit, total_deals, winning_deals, losing_deals = cached[1]
+        else:
+            deals = self.mt5.get_history_deals(from_date, to_date, group=self.config.get('summary_group')) or []
+            deals = [d for d in deals if d.ticket > self._last_seen_deal_ticket]
+            if deals:
+                self._last_seen_deal_ticket = max(d.ticket for d in deals)
+            total_profit, total_deals, winning_deals, losing_deals = self._aggregate_deals(deals)
+            self._summary_cache = {key: (time.monotonic(), (total_profit, total_deals, winning_deals, losing_deals))}
+
+        msg = SUMMARY_TMPL.format_map({
+            'hours': hours,
+            'time': to_date,
+            'total_deals': total_deals,
+            'winning_deals': winning_deals,
+            'losing_deals': losing_deals,
+            'total_profit': total_profit,
+        })
         
         logger.info(f"Sending summary: {msg}")
         self.send_telegram_message(msg)
 
+    @staticmethod
+    def _aggregate_deals(deals):
+        """
+        Return (total_profit, total_deals, winning_deals, losing_deals) for the deals.
+        """
+        if not deals:
+            return 0.0, 0, 0, 0
+
+        # Entry deals usually have profit=0. Exit deals have profit.
+        # Only deals that affect P&L (net != 0) are counted.
+        arr = np.array([(d.profit, d.swap, d.commission) for d in deals], dtype=np.float64)
+        net = arr.sum(axis=1)
+        net = net[net != 0]
+        return float(net.sum()), int(net.size), int((net > 0).sum()), int((net < 0).sum())
+
     def send_heartbeat(self, balance):
         """
         Send a heartbeat message with current balance.
         """
-        msg = f"💓 *Heartbeat*\nBot is alive.\nBalance: *${balance:.2f}*"
+        msg = HEARTBEAT_TMPL.format_map({'balance': balance})
         logger.info(f"Sending heartbeat: {msg}")
         self.send_telegram_message(msg)
 
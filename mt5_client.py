@@ -1,21 +1,64 @@
 import MetaTrader5 as mt5
 import pandas as pd
 import time
+import random
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 logger = logging.getLogger(__name__)
 
+# How long symbol specs and quotes are reused before asking the terminal again (seconds)
+SYMBOL_INFO_TTL = 5.0
+TICK_TTL = 0.1
+
+# Timeframe strings accepted by get_candles, and the reverse for log messages
+_TF_MAP = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1,
+    "W1": mt5.TIMEFRAME_W1,
+    "MN1": mt5.TIMEFRAME_MN1
+}
+_TF_NAMES = {v: k for k, v in _TF_MAP.items()}
+
+# Reconnect backoff: full jitter over min(cap, base * 2**attempt) seconds
+RECONNECT_BASE = 0.5
+RECONNECT_CAP = 60.0
+
 class MT5Client:
     def __init__(self, config):
         self.config = config
         self.connected = False
+        self._reconnect_attempt = 0 # consecutive failed reconnects, drives the backoff
+        self._pool = None # created on first batch call
+        self._order_pool = None # separate so order sends never queue behind data fetches
+        # (symbol, mt5 timeframe) -> column buffers of the last n candles fetched, updated in place
+        self._rates_cache = {}
+        self._symbol_names = None
+        # symbol -> (monotonic fetch time, value)
+        self._sym_cache = {}
+        self._tick_cache = {}
+
+    @staticmethod
+    def _backoff(attempt: int):
+        """
+        Sleep a random time in [0, min(cap, base * 2**attempt)] seconds.
+        """
+        delay = min(RECONNECT_CAP, RECONNECT_BASE * 2 ** attempt)
+        time.sleep(random.uniform(0, delay))
 
     def initialize(self) -> bool:
         """
-        Initialize connection to MT5 with retry logic.
+        Initialize connection to MT5 with retry logic (exponential backoff with jitter).
         """
-        max_retries = 3
+        max_retries = self.config.get('max_retries', 3)
         for attempt in range(max_retries):
+            if attempt:
+                self._backoff(attempt - 1)
             try:
                 # Attempt to initialize with specific account if provided, else default
                 if self.config.get('login') and self.config.get('password'):
@@ -34,15 +77,19 @@ class MT5Client:
                 else:
                     error_code = mt5.last_error()
                     logger.warning(f"MT5 initialize failed (Attempt {attempt+1}/{max_retries}), error: {error_code}")
-                    time.sleep(1)
             except Exception as e:
                 logger.error(f"Exception during MT5 initialize: {e}")
-                time.sleep(1)
         
         logger.critical("Failed to connect to MT5 after retries.")
         return False
 
     def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._order_pool is not None:
+            self._order_pool.shutdown(wait=True) # let in-flight orders get their result
+            self._order_pool = None
         mt5.shutdown()
         self.connected = False
         logger.info("MT5 connection shutdown.")
@@ -54,7 +101,15 @@ class MT5Client:
         if not mt5.terminal_info():
             logger.warning("MT5 connection lost. Attempting to reconnect...")
             self.connected = False
-            return self.initialize()
+            # Back off further each time a reconnect has already failed, so a flapping
+            # terminal is not hammered by the main loop
+            if self._reconnect_attempt:
+                self._backoff(self._reconnect_attempt)
+            if self.initialize():
+                self._reconnect_attempt = 0
+                return True
+            self._reconnect_attempt += 1
+            return False
         return True
 
     def get_candles(self, symbol: str, timeframe_str: str, n: int) -> pd.DataFrame:
@@ -62,54 +117,118 @@ class MT5Client:
         Fetch n candles for symbol and timeframe.
         timeframe_str: "M1", "M5", "M15", "M30", "H1", "H4", "D1", "W1", "MN1"
         """
-        tf_map = {
-            "M1": mt5.TIMEFRAME_M1,
-            "M5": mt5.TIMEFRAME_M5,
-            "M15": mt5.TIMEFRAME_M15,
-            "M30": mt5.TIMEFRAME_M30,
-            "H1": mt5.TIMEFRAME_H1,
-            "H4": mt5.TIMEFRAME_H4,
-            "D1": mt5.TIMEFRAME_D1,
-            "W1": mt5.TIMEFRAME_W1,
-            "MN1": mt5.TIMEFRAME_MN1
-        }
-        
-        mt5_tf = tf_map.get(timeframe_str)
+        mt5_tf = _TF_MAP.get(timeframe_str)
         if mt5_tf is None:
             logger.error(f"Invalid timeframe: {timeframe_str}")
             return pd.DataFrame()
 
+        key = (symbol, mt5_tf)
+        cols = self._rates_cache.get(key)
+        if n >= 2 and cols is not None and len(cols['time']) == n:
+            # Only the forming bar and the one before it are re-read
+            rates = mt5.copy_rates_from_pos(symbol, mt5_tf, 0, 2)
+            if rates is not None and len(rates) == 2:
+                times = rates['time'].astype('datetime64[s]')
+                last = cols['time'][-1]
+                # Same forming bar as last call, or exactly one bar closed since (shift by one)
+                shift = 0 if times[1] == last else 1 if times[0] == last else None
+                if shift is not None:
+                    for name, col in cols.items():
+                        if shift:
+                            col[:-1] = col[1:]
+                        col[-2:] = times if name == 'time' else rates[name]
+                    # Copies the buffers: callers add columns and keep arrays across calls
+                    return pd.DataFrame(cols)
+                # Several bars closed since the last call: full fetch
+                logger.debug(f"Candle cache for {symbol} {_TF_NAMES[mt5_tf]} is stale. Refetching {n} bars.")
+
         rates = mt5.copy_rates_from_pos(symbol, mt5_tf, 0, n)
         
         if rates is None:
             logger.error(f"Failed to get rates for {symbol} {timeframe_str}")
             return pd.DataFrame()
             
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        return df
+        cols = {name: rates[name].copy() for name in rates.dtype.names}
+        cols['time'] = rates['time'].astype('datetime64[s]').astype('datetime64[ns]')
+        # Cached only when the buffers can take the 2-bar update
+        if n >= 2 and len(rates) == n:
+            self._rates_cache[key] = cols
+        return pd.DataFrame(cols)
+
+    def _batch_pool(self) -> ThreadPoolExecutor:
+        # The MT5 binding releases the GIL while waiting on the terminal, so threads overlap round trips
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=16)
+        return self._pool
+
+    def get_candles_batch(self, symbols: list, timeframe_str: str, n: int) -> dict:
+        """
+        Fetch n candles for several symbols concurrently. Returns {symbol: DataFrame}.
+        """
+        pool = self._batch_pool()
+        futures = {pool.submit(self.get_candles, s, timeframe_str, n): s for s in symbols}
+        return {futures[f]: f.result() for f in as_completed(futures)}
+
+    def get_ticks_batch(self, symbols: list) -> dict:
+        """
+        Fetch ticks for several symbols concurrently. Unknown symbols are skipped.
+        Returns {symbol: tick}.
+        """
+        if self._symbol_names is None:
+            all_symbols = mt5.symbols_get()
+            self._symbol_names = {s.name for s in all_symbols} if all_symbols else None
+
+        valid = [s for s in symbols if self._symbol_names is None or s in self._symbol_names]
+        for s in set(symbols) - set(valid):
+            logger.error(f"Unknown symbol {s}. Skipping tick request.")
+
+        pool = self._batch_pool()
+        futures = {pool.submit(self.get_tick, s): s for s in valid}
+        return {futures[f]: f.result() for f in as_completed(futures)}
+
+    def get_tick(self, symbol: str, fresh: bool = False):
+        """
+        Latest quote for symbol as the terminal's Tick namedtuple (tick.ask, tick.bid, tick.last),
+        or None if unavailable. Quotes younger than TICK_TTL are reused for pre-trade
+        checks; pass fresh=True to always read the terminal (order pricing does).
+        """
+        now = time.monotonic()
+        if not fresh:
+            cached = self._tick_cache.get(symbol)
+            if cached is not None and now - cached[0] < TICK_TTL:
+                return cached[1]
 
-    def get_tick(self, symbol: str) -> dict:
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
             logger.error(f"Failed to get tick for {symbol}")
-            return {}
-        return {'ask': tick.ask, 'bid': tick.bid, 'last': tick.last}
+            return None
+        self._tick_cache[symbol] = (now, tick)
+        return tick
 
     def get_symbol_info(self, symbol: str):
-        return mt5.symbol_info(symbol)
+        """
+        Symbol specification (point, volume step, tick value...), reused for SYMBOL_INFO_TTL seconds.
+        """
+        now = time.monotonic()
+        cached = self._sym_cache.get(symbol)
+        if cached is not None and now - cached[0] < SYMBOL_INFO_TTL:
+            return cached[1]
 
-    def place_order_market(self, symbol: str, volume: float, side: str, sl: float=None, tp: float=None, deviation:int=20, comment:str=None, magic:int=0) -> dict:
+        info = mt5.symbol_info(symbol)
+        if info is not None:
+            self._sym_cache[symbol] = (now, info)
+        return info
+
+    def _market_request(self, symbol: str, volume: float, side: str, sl: float=None, tp: float=None, deviation:int=20, comment:str=None, magic:int=0) -> dict:
         """
-        Place a market order.
-        side: 'BUY' or 'SELL'
+        Build a TRADE_ACTION_DEAL request at the current tick. Returns None if no tick data.
         """
-        tick = self.get_tick(symbol)
-        if not tick:
-            return {'retcode': -1, 'comment': "No tick data"}
+        tick = self.get_tick(symbol, fresh=True)
+        if tick is None:
+            return None
 
         action_type = mt5.ORDER_TYPE_BUY if side == 'BUY' else mt5.ORDER_TYPE_SELL
-        price = tick['ask'] if side == 'BUY' else tick['bid']
+        price = tick.ask if side == 'BUY' else tick.bid
         
         request = {
             "action": mt5.TRADE_ACTION_DEAL,
@@ -128,6 +247,16 @@ class MT5Client:
             request["sl"] = sl
         if tp:
             request["tp"] = tp
+        return request
+
+    def place_order_market(self, symbol: str, volume: float, side: str, sl: float=None, tp: float=None, deviation:int=20, comment:str=None, magic:int=0) -> dict:
+        """
+        Place a market order.
+        side: 'BUY' or 'SELL'
+        """
+        request = self._market_request(symbol, volume, side, sl, tp, deviation, comment, magic)
+        if request is None:
+            return {'retcode': -1, 'comment': "No tick data"}
             
         result = mt5.order_send(request)
         
@@ -136,6 +265,46 @@ class MT5Client:
              
         return result._asdict()
 
+    def place_orders_market_batch(self, orders: list) -> dict:
+        """
+        Place several market orders concurrently, overlapping the broker round trips.
+        orders: list of keyword dicts for place_order_market (symbol, volume, side, sl, tp, ...),
+        at most one per symbol. Returns {symbol: result dict}.
+        """
+        if self._order_pool is None:
+            self._order_pool = ThreadPoolExecutor(max_workers=8)
+        futures = {self._order_pool.submit(self.place_order_market, **o): o['symbol'] for o in orders}
+        results = {}
+        for f in as_completed(futures):
+            symbol = futures[f]
+            try:
+                results[symbol] = f.result()
+            except Exception as e:
+                logger.error(f"Exception placing order for {symbol}: {e}")
+                results[symbol] = {'retcode': -1, 'comment': str(e)}
+        return results
+
+    def place_order_market_async(self, symbol: str, volume: float, side: str, sl: float=None, tp: float=None, deviation:int=20, comment:str=None, magic:int=0) -> dict:
+        """
+        Submit a market order without waiting for the trade server round trip.
+        Falls back to the blocking place_order_market if the terminal build has no async send.
+        The fill has to be picked up later from history deals.
+        """
+        order_send_async = getattr(mt5, 'order_send_async', None)
+        if order_send_async is None:
+            return self.place_order_market(symbol, volume, side, sl, tp, deviation, comment, magic)
+
+        request = self._market_request(symbol, volume, side, sl, tp, deviation, comment, magic)
+        if request is None:
+            return {'retcode': -1, 'comment': "No tick data"}
+
+        result = order_send_async(request)
+
+        if result is None:
+             return {'retcode': -1, 'comment': "Async order send failed (None result)"}
+
+        return result._asdict()
+
     def modify_position(self, ticket: int, sl: float = None, tp: float = None) -> bool:
         """
         Modify SL/TP of an existing position.
@@ -174,7 +343,18 @@ class MT5Client:
             return {}
         return info._asdict()
 
+    def positions_total(self) -> int:
+        """
+        Number of open positions across all symbols (no position payload transferred).
+        """
+        total = mt5.positions_total()
+        return total if total is not None else 0
+
     def get_open_positions(self, symbol: str=None) -> list:
+        """
+        Open positions, optionally for one symbol, as the terminal's TradePosition
+        namedtuples (pos.ticket, pos.sl, pos.price_current, ...).
+        """
         if symbol:
             positions = mt5.positions_get(symbol=symbol)
         else:
@@ -183,13 +363,21 @@ class MT5Client:
         if positions is None:
             return []
             
-        return [p._asdict() for p in positions]
+        return list(positions)
 
-    def get_history_deals(self, from_date, to_date) -> list:
+    def get_history_deals(self, from_date, to_date, group: str=None) -> list:
         """
         Fetch history deals within the specified time range.
+        group: optional MT5 symbol filter, e.g. "*XAUUSD*".
+        Returns the terminal's TradeDeal namedtuples as-is (deal.ticket, deal.profit, ...);
+        use deal._asdict() where a dict is really needed. Returns None if the query failed,
+        so callers can tell a failure from an empty window.
         """
-        deals = mt5.history_deals_get(from_date, to_date)
+        if group:
+            deals = mt5.history_deals_get(from_date, to_date, group=group)
+        else:
+            deals = mt5.history_deals_get(from_date, to_date)
         if deals is None:
-            return []
-        return [d._asdict() for d in deals]
+            logger.error(f"Failed to get history deals: {mt5.last_error()}")
+            return None
+        return list(deals)
@@ -1,98 +1,206 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import json
 import logging
+import os
+from functools import lru_cache
+import numpy as np
 from datetime import datetime, timedelta
 import time
 
 logger = logging.getLogger(__name__)
 
+CALENDAR_URL = "https://nfs.faireconomy.media/ff_calendar_thisweek.json"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rsi-trade")
+
+# (connect, read) timeouts for calendar downloads
+HTTP_TIMEOUT = (3, 10)
+
+# Shared keep-alive session for calendar downloads; transient gateway errors are retried
+# with backoff, and the last response is handed back instead of raising
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=2,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False),
+))
+
 class NewsFilter:
     def __init__(self, config):
         self.config = config
-        self.events = []
+        self._set_events([])
         self.last_fetch_time = None
         self.cache_duration = timedelta(hours=4)
         self.impact_levels = ['High'] # Default to High only
         if config.get('include_medium', False):
             self.impact_levels.append('Medium')
+        # Pause window around each event, in seconds
+        self._before_s = int(config.get('minutes_before', 30) * 60)
+        self._after_s = int(config.get('minutes_after', 30) * 60)
+
+        # Warm the currency map for known symbols
+        for symbol in config.get('symbols', []):
+            self.get_affected_currencies(symbol)
+
+        # On-disk copy of the last good calendar plus its ETag/Last-Modified validators
+        cache_dir = config.get('cache_dir', DEFAULT_CACHE_DIR)
+        self.cache_path = os.path.join(cache_dir, "ff_calendar.json")
+        self.meta_path = os.path.join(cache_dir, "ff_calendar.meta.json")
 
-    def get_affected_currencies(self, symbol):
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_affected_currencies(symbol):
         """
-        Map symbol to list of currencies.
+        Map symbol to tuple of currencies (memoized per symbol).
         """
         # Basic Forex mapping
         if len(symbol) == 6:
-            return [symbol[:3], symbol[3:]]
+            return (symbol[:3], symbol[3:])
         
         # Gold/Indices
         if "XAU" in symbol or "GOLD" in symbol:
-            return ['USD']
+            return ('USD',)
         if "BTC" in symbol:
-            return ['USD']
+            return ('USD',)
         if "US30" in symbol or "DJI" in symbol:
-            return ['USD']
+            return ('USD',)
             
-        return ['USD'] # Default fallback
+        return ('USD',) # Default fallback
+
+    def _set_events(self, events):
+        """
+        Store events and index them: parse dates once into a sorted epoch-seconds array
+        with parallel country/impact/title arrays for binary-searched lookups.
+        """
+        self.events = events
+        parsed = []
+        for event in events:
+            try:
+                # Format: "2025-11-25T08:30:00-05:00"
+                ts = int(datetime.fromisoformat(event['date']).timestamp())
+            except (KeyError, TypeError, ValueError):
+                continue
+            parsed.append((ts, event.get('country', ''), event.get('impact', ''), event.get('title', '')))
+        parsed.sort(key=lambda e: e[0])
+
+        self._event_ts = np.array([e[0] for e in parsed], dtype=np.int64)
+        self._event_country = np.array([e[1] for e in parsed], dtype=str)
+        self._event_impact = np.array([e[2] for e in parsed], dtype=str)
+        self._event_title = np.array([e[3] for e in parsed], dtype=object)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, body: str, meta: dict):
+        """
+        Persist calendar body and validators atomically (write temp file, then os.replace).
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            for path, content in ((self.cache_path, body), (self.meta_path, json.dumps(meta))):
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write calendar cache: {e}")
+
+    def _load_cached_events(self, reason):
+        """
+        Fall back to the last good calendar on disk if nothing is loaded yet.
+        """
+        if self.events:
+            return
+        cached = self._read_json(self.cache_path)
+        if cached is not None:
+            self._set_events(cached)
+            logger.warning(f"{reason}. Using cached calendar ({len(self.events)} events).")
 
     def fetch_calendar(self):
         """
-        Fetch calendar from public JSON endpoint.
+        Fetch calendar from public JSON endpoint, using a conditional GET against the disk cache.
         """
-        url = "https://nfs.faireconomy.media/ff_calendar_thisweek.json"
+        cached = self._read_json(self.cache_path)
+
+        # Cold start with a fresh disk cache: no network round trip needed
+        if self.last_fetch_time is None and cached is not None:
+            cache_time = datetime.fromtimestamp(os.path.getmtime(self.cache_path))
+            if datetime.now() - cache_time < self.cache_duration:
+                self._set_events(cached)
+                self.last_fetch_time = cache_time
+                logger.info(f"Loaded {len(self.events)} news events from cache.")
+                return
+
+        headers = {}
+        meta = self._read_json(self.meta_path) or {}
+        if cached is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
         try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                self.events = response.json()
+            response = _SESSION.get(CALENDAR_URL, headers=headers, timeout=HTTP_TIMEOUT)
+            if response.status_code == 304:
+                if not self.events:
+                    self._set_events(cached)
+                self.last_fetch_time = datetime.now()
+                os.utime(self.cache_path)
+                logger.info("News calendar not modified.")
+            elif response.status_code == 200:
+                self._set_events(response.json())
                 self.last_fetch_time = datetime.now()
+                self._write_cache(response.text, {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                })
                 logger.info(f"Fetched {len(self.events)} news events.")
             else:
                 logger.error(f"Failed to fetch calendar: {response.status_code}")
+                self._load_cached_events("Calendar fetch failed")
         except Exception as e:
             logger.error(f"Exception fetching calendar: {e}")
+            self._load_cached_events("Calendar fetch failed")
 
     def is_news_imminent(self, symbol):
         """
         Check if high-impact news is imminent for the symbol.
         Returns: (bool, event_title, minutes_to_event)
         """
+        # One clock snapshot per call; everything below compares epoch seconds
+        now = datetime.now()
         # Refresh cache if needed
-        if not self.last_fetch_time or datetime.now() - self.last_fetch_time > self.cache_duration:
+        if not self.last_fetch_time or now - self.last_fetch_time > self.cache_duration:
             self.fetch_calendar()
 
-        if not self.events:
+        if len(self._event_ts) == 0:
             return False, None, None
 
         currencies = self.get_affected_currencies(symbol)
-        now = datetime.now().astimezone() # Aware datetime
-        
-        minutes_before = self.config.get('minutes_before', 30)
-        minutes_after = self.config.get('minutes_after', 30)
-
-        for event in self.events:
-            # Filter by Currency
-            if event['country'] not in currencies and event['country'] != 'All':
-                continue
-                
-            # Filter by Impact
-            if event['impact'] not in self.impact_levels:
-                continue
+        now_ts = int(now.timestamp())
 
-            # Parse Date
-            try:
-                # Format: "2025-11-25T08:30:00-05:00"
-                # Python 3.7+ supports fromisoformat
-                event_time = datetime.fromisoformat(event['date'])
-            except ValueError:
-                continue
-
-            # Check Time Window
-            # Event is in future (or recent past)
-            # We pause if: event_time - before <= now <= event_time + after
-            
-            start_pause = event_time - timedelta(minutes=minutes_before)
-            end_pause = event_time + timedelta(minutes=minutes_after)
+        # We pause if: event_time - before <= now <= event_time + after,
+        # i.e. now - after <= event_time <= now + before
+        window_start_ts = now_ts - self._after_s
+        window_end_ts = now_ts + self._before_s
+        lo = np.searchsorted(self._event_ts, window_start_ts, side='left')
+        hi = np.searchsorted(self._event_ts, window_end_ts, side='right')
+        if lo == hi:
+            return False, None, None
 
-            if start_pause <= now <= end_pause:
-                time_to_event = (event_time - now).total_seconds() / 60
-                return True, event['title'], time_to_event
+        # Filter by Currency and Impact within the window only
+        mask = (np.isin(self._event_country[lo:hi], list(currencies) + ['All'])
+                & np.isin(self._event_impact[lo:hi], self.impact_levels))
+        hits = np.flatnonzero(mask)
+        if hits.size == 0:
+            return False, None, None
 
-        return False, None, None
+        i = lo + hits[0]
+        time_to_event = float(self._event_ts[i] - now_ts) / 60
+        return True, self._event_title[i], time_to_event
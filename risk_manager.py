@@ -1,8 +1,20 @@
 import logging
 import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# How far back each incremental sync re-reads before the previous sync time
+SYNC_OVERLAP = timedelta(minutes=1)
+
+# Fields of a TradeDeal that the daily stats need
+DEAL_DTYPE = np.dtype([('ticket', 'i8'), ('profit', 'f8'), ('swap', 'f8'), ('commission', 'f8')])
+
+# Per-balance risk limits, computed once per decision cycle (see RiskManager.risk_budget)
+RiskBudget = namedtuple('RiskBudget', 'risk_amount max_daily_loss ok')
+
 class RiskManager:
     def __init__(self, config, mt5_client):
         self.config = config
@@ -10,59 +22,83 @@ class RiskManager:
         self.daily_loss = 0.0
         self.consecutive_losses = 0
         self.halt_trading = False
+        # Incremental sync cursor and running totals for the current day
+        self._day_start = None
+        self._last_sync_time = None
+        self._last_deal_ticket = 0
+        self._daily_profit = 0.0
+        self._loss_streak = 0
 
     def sync_daily_stats(self):
         """
         Sync daily loss and consecutive losses from MT5 history.
+        Only deals since the previous sync are fetched and folded into running
+        totals; the totals restart at midnight.
         """
-        from datetime import datetime, timedelta
-        
         now = datetime.now()
         # Start of day (00:00:00)
-        from_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        if self._day_start != day_start:
+            self._day_start = day_start
+            self._last_sync_time = day_start
+            self._last_deal_ticket = 0
+            self._daily_profit = 0.0
+            self._loss_streak = 0
+
+        # Re-read a short overlap so deals that land late on the boundary are not missed;
+        # the ticket watermark drops the ones already counted.
+        from_date = max(day_start, self._last_sync_time - SYNC_OVERLAP)
         deals = self.mt5.get_history_deals(from_date, now)
-        
-        daily_profit = 0.0
-        consecutive_losses = 0
-        
-        # Sort deals by time to count consecutive losses correctly
-        # Assuming get_history_deals returns list of dicts, we need to sort if not sorted.
-        # MT5 usually returns sorted by time, but let's be safe if we can, 
-        # or just iterate.
-        
-        for deal in deals:
-            profit = deal.get('profit', 0.0)
-            swap = deal.get('swap', 0.0)
-            commission = deal.get('commission', 0.0)
-            net_profit = profit + swap + commission
-            
-            # Filter out non-trading deals (balance ops) if needed.
+        if deals is None:
+            # Failed query: keep the cursor so the next sync re-reads this window
+            logger.warning("Deal history query failed. Risk state not updated.")
+            return
+        self._last_sync_time = now
+
+        if deals:
+            arr = np.array([(d.ticket, d.profit, d.swap, d.commission) for d in deals], dtype=DEAL_DTYPE)
+            arr = arr[arr['ticket'] > self._last_deal_ticket]
+            if arr.size:
+                self._last_deal_ticket = int(arr['ticket'].max())
+
+            net = arr['profit'] + arr['swap'] + arr['commission']
             # Usually entry=IN has 0 profit. entry=OUT has profit.
-            # We only care about realized P&L.
-            if net_profit == 0:
-                continue
-                
-            daily_profit += net_profit
-            
-            if net_profit < 0:
-                consecutive_losses += 1
-            else:
-                consecutive_losses = 0
+            # Only realized P&L (net != 0) counts; balance ops and entries are dropped.
+            net = net[net != 0]
+            if net.size:
+                self._daily_profit += float(net.sum())
+                # MT5 returns deals sorted by time. The streak is the run of losses at the end
+                # of this batch, continuing the previous streak if the whole batch lost.
+                not_loss = net[::-1] >= 0
+                if not_loss.any():
+                    self._loss_streak = int(np.argmax(not_loss))
+                else:
+                    self._loss_streak += int(net.size)
                 
         # If daily_profit is negative, that's our daily loss (positive number)
-        if daily_profit < 0:
-            self.daily_loss = abs(daily_profit)
+        if self._daily_profit < 0:
+            self.daily_loss = abs(self._daily_profit)
         else:
             self.daily_loss = 0.0
             
-        self.consecutive_losses = consecutive_losses
+        self.consecutive_losses = self._loss_streak
         
         logger.info(f"Risk State Synced: Daily Loss={self.daily_loss}, Consec Losses={self.consecutive_losses}")
 
-    def check_safety(self, account_balance):
+    def risk_budget(self, account_balance) -> RiskBudget:
+        """
+        Risk amount per trade and daily loss limit for this balance, plus the safety check result.
+        """
+        max_daily_loss = account_balance * (self.config['max_daily_loss_percent'] / 100.0)
+        risk_amount = account_balance * (self.config['risk_percent_per_trade'] / 100.0)
+        ok = self.check_safety(account_balance, max_daily_loss)
+        return RiskBudget(risk_amount, max_daily_loss, ok)
+
+    def check_safety(self, account_balance, max_daily_loss=None):
         """
         Check circuit breakers (daily loss, consecutive losses).
+        max_daily_loss: precomputed limit for this balance, derived from config if omitted.
         """
         # Always sync before checking? Or rely on periodic sync?
         # For safety, let's trust the internal state which should be kept up to date.
@@ -77,7 +113,8 @@ class RiskManager:
             self.halt_trading = True
             return False
 
-        max_daily_loss = account_balance * (self.config['max_daily_loss_percent'] / 100.0)
+        if max_daily_loss is None:
+            max_daily_loss = account_balance * (self.config['max_daily_loss_percent'] / 100.0)
         if self.daily_loss >= max_daily_loss:
             logger.warning(f"Max daily loss reached ({self.daily_loss} >= {max_daily_loss}). Halting trading.")
             self.halt_trading = True
@@ -90,14 +127,17 @@ class RiskManager:
             
         return True
 
-    def compute_lot_size(self, symbol: str, sl_price: float, entry_price: float, account_balance: float) -> float:
+    def compute_lot_size(self, symbol: str, sl_price: float, entry_price: float, account_balance: float = None, budget: RiskBudget = None) -> float:
         """
         Compute lot size based on risk percentage and Stop Loss distance.
+        budget: RiskBudget already computed for this cycle; built from account_balance if omitted.
         """
-        if not self.check_safety(account_balance):
+        if budget is None:
+            budget = self.risk_budget(account_balance)
+        if not budget.ok:
             return 0.0
 
-        risk_amount = account_balance * (self.config['risk_percent_per_trade'] / 100.0)
+        risk_amount = budget.risk_amount
         
         # Get symbol properties
         symbol_info = self.mt5.get_symbol_info(symbol)
@@ -1,13 +1,24 @@
 from dataclasses import dataclass
+from collections import deque
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import indicators
+from indicators import njit
 import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+INDICATOR_COLUMNS = ['rsi', 'rsi_wma', 'rsi_ema', 'adx']
+# Stored dtype of the indicator columns. They are bounded oscillators (0..100), so float32 is
+# plenty and halves the bytes scanned; the kernels and the streaming state stay float64.
+INDICATOR_DTYPE = np.float32
+
+@dataclass(frozen=True)
 class Signal:
+    # Immutable and without a per-instance __dict__ (dataclass(slots=True) needs Python 3.10)
+    __slots__ = ('symbol', 'side', 'entry_price', 'sl_price', 'tp_price', 'confidence', 'reason', 'tf1_close_time')
+
     symbol: str
     side: str            # "BUY" or "SELL"
     entry_price: float
@@ -17,189 +28,492 @@ class Signal:
     reason: str
     tf1_close_time: datetime
 
+    # Frozen slotted instances can't be restored through setattr; pickle/copy go through these
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+@dataclass
+class IndicatorState:
+    """
+    Streaming indicator state after the last processed bar of one (symbol, timeframe).
+    """
+    last_time: datetime
+    last_close: float
+    avg_gain: float          # Wilder RSI averages
+    avg_loss: float
+    ema_prev: float          # EMA(RSI)
+    wma_ring: np.ndarray     # last wma_period RSI values, oldest at wma_idx
+    wma_idx: int
+    wma_sum: float           # plain sum of wma_ring
+    wma_wsum: float          # weighted sum of wma_ring (newest weight = wma_period)
+    adx_state: tuple         # (prev_high, prev_low, trs, pdms, mdms, adx)
+
+@dataclass
+class TFView:
+    """
+    Column arrays of one timeframe's frame, taken once at the generate() boundary.
+    Indicator arrays are INDICATOR_DTYPE, prices float64. adx is None when the frame has no ADX column.
+    """
+    rsi: np.ndarray
+    wma: np.ndarray
+    ema: np.ndarray
+    close: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    time: np.ndarray
+    adx: np.ndarray = None
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> 'TFView':
+        def col(name, dtype=np.float64):
+            return df[name].to_numpy(dtype=dtype, copy=False)
+        return cls(
+            rsi=col('rsi', INDICATOR_DTYPE),
+            wma=col('rsi_wma', INDICATOR_DTYPE),
+            ema=col('rsi_ema', INDICATOR_DTYPE),
+            close=col('close'),
+            low=col('low'),
+            high=col('high'),
+            time=df['time'].to_numpy(),
+            adx=col('adx', INDICATOR_DTYPE) if 'adx' in df.columns else None,
+        )
+
+@njit(cache=True)
+def _decide(rsi3, wma3, rsi2, wma2, rsi1, wma1, ema1, swing_low, swing_high, entry,
+            adx_val, adx_threshold, rsi_upper, rsi_lower, tol2, tp_rr, swing, sl_dist):
+    """
+    Decision block of SignalEngine.generate on plain floats and float64 arrays.
+    rsi3/wma3/rsi2/wma2 are the latest TF3/TF2 values; the TF1 arrays end at the closed bar.
+    Filters run cheapest first and return as soon as one rejects: ADX -> bias -> zone -> crossover.
+    Returns (side, sl, tp) with side 1 = LONG, -1 = SHORT, 0 = no signal.
+    """
+    # --- ADX Filter (TF1) ---
+    # Trend must be strong enough on the execution timeframe; NaN (warm-up) != NaN skips it
+    if adx_val == adx_val and adx_val < adx_threshold:
+        return 0, 0.0, 0.0
+
+    # 1. Bias Check (TF3)
+    # Extremes decide outright (>= rsi_upper LONG, <= rsi_lower SHORT), otherwise RSI vs WMA45.
+    # bias_code 1 = LONG, 0 = SHORT; direction = +1 / -1 scales the price offsets below.
+    bias_code = 1 if (rsi3 >= rsi_upper) or (rsi3 > wma3 and rsi3 > rsi_lower) else 0
+    direction = 2 * bias_code - 1
+
+    # 2. Entry Zone (TF2)
+    # Near WMA45 (squared distance vs tol2 = tolerance**2),
+    # or RSI in [40..55] for LONG / [45..60] for SHORT (Symmetric)
+    zone_lo = 45.0 - 5.0 * bias_code
+    d = rsi2 - wma2
+    if not d * d <= tol2 and not (zone_lo <= rsi2 <= zone_lo + 15.0): # NaN fails both
+        return 0, 0.0, 0.0
+
+    # 3. Confirmation (TF1): EMA9 or RSI crosses WMA45 in the bias direction
+    # ("RSI_TF1 re-test WMA45" is approximated by the RSI crossover).
+    # Both are sign changes of (x - wma) * direction: <= 0 on the previous bar, > 0 on the closed one.
+    wma_p, wma_c = wma1[-2], wma1[-1]
+    de_p, de_c = (ema1[-2] - wma_p) * direction, (ema1[-1] - wma_c) * direction
+    dr_p, dr_c = (rsi1[-2] - wma_p) * direction, (rsi1[-1] - wma_c) * direction
+    if not ((de_p <= 0 < de_c) or (dr_p <= 0 < dr_c)):
+        return 0, 0.0, 0.0
+
+    # 4. SL (swing low/high over the lookback, or a fixed distance) and TP at tp_rr
+    if swing:
+        sl = swing_low if bias_code == 1 else swing_high
+    else:
+        sl = entry - direction * sl_dist
+    return direction, sl, entry + direction * abs(entry - sl) * tp_rr
+
+class SwingTracker:
+    """
+    Rolling min(low) / max(high) over the last `lookback` bars pushed, kept in monotonic
+    deques of (bar index, value) so each new bar costs amortized O(1).
+    """
+    def __init__(self, lookback: int):
+        self.lookback = lookback
+        self._lows = deque()   # lows increasing from the front
+        self._highs = deque()  # highs decreasing from the front
+        self._idx = -1
+        self._count = 0        # bars pushed since the last rebuild
+        self._last = None      # (time, low, high) of the last bar pushed
+
+    def push(self, low: float, high: float):
+        self._idx += 1
+        self._count += 1
+        i = self._idx
+        oldest = i - self.lookback + 1
+        lows, highs = self._lows, self._highs
+        while lows and lows[-1][1] >= low:
+            lows.pop()
+        lows.append((i, low))
+        while lows[0][0] < oldest:
+            lows.popleft()
+        while highs and highs[-1][1] <= high:
+            highs.pop()
+        highs.append((i, high))
+        while highs[0][0] < oldest:
+            highs.popleft()
+
+    def min_low(self) -> float:
+        return self._lows[0][1]
+
+    def max_high(self) -> float:
+        return self._highs[0][1]
+
+    def sync(self, time: np.ndarray, low: np.ndarray, high: np.ndarray):
+        """
+        Push the bars of a (time-sorted) frame that are newer than the last one pushed.
+        Starts over from the frame's last `lookback` bars if it does not continue the previous one,
+        or if either the frame or the tracked history is shorter than `lookback`.
+        """
+        n = len(time)
+        k = 0
+        if self._last is not None and n >= self.lookback and self._count >= self.lookback:
+            last_time, last_low, last_high = self._last
+            k = int(np.searchsorted(time, last_time, side='right'))
+            if k == 0 or time[k - 1] != last_time or low[k - 1] != last_low or high[k - 1] != last_high:
+                k = 0
+        if k == 0:
+            self._lows.clear()
+            self._highs.clear()
+            self._count = 0
+            k = max(0, n - self.lookback)
+        for j in range(k, n):
+            self.push(low[j], high[j])
+        self._last = (time[-1], low[-1], high[-1])
+
 class SignalEngine:
     def __init__(self, config):
         self.config = config
+        # Resolve config once; generate() and the indicator paths only read attributes
+        self._rsi_period = int(config['rsi_period'])
+        self._wma_period = int(config['wma_period'])
+        self._ema_period = int(config['ema_period'])
+        self._adx_period = int(config.get('adx_period', 14))
+        self._adx_threshold = float(config.get('adx_threshold', 25))
+        self._rsi_upper = float(config['rsi_upper'])
+        self._rsi_lower = float(config['rsi_lower'])
+        self._zone_tol = float(config['tf2_zone_tolerance'])
+        # Squared, for the abs-free zone test; a negative tolerance never matches
+        self._zone_tol2 = self._zone_tol * self._zone_tol if self._zone_tol >= 0 else -1.0
+        self._sl_is_swing = config['sl_method'] == 'swing' # otherwise fixed distance (sl_points)
+        # Required for the swing SL, unused otherwise
+        self._swing_lookback = int(config['swing_lookback']) if self._sl_is_swing else None
+        self._sl_points = float(config.get('sl_points', 500)) # Default 500 points
+        self._tp_rr = float(config['tp_rr'])
+        # Per-symbol point size guessed from price when the caller has no symbol info
+        self._point_cache = {}
+        # Per-symbol swing low/high trackers for the swing SL
+        self._swing = {}
+        # key -> (IndicatorState, times, indicator values) of the last keyed compute_indicators call
+        self._ind_cache = {}
+        # Config arguments of _decide, in its parameter order (set once, never changes)
+        self._decide_args = (self._adx_threshold, self._rsi_upper, self._rsi_lower,
+                             self._zone_tol2, self._tp_rr, self._sl_is_swing)
+
+    def _fallback_point(self, symbol: str, entry_price: float) -> float:
+        """
+        Heuristic point size for a symbol, worked out once from its price and cached.
+        """
+        point = self._point_cache.get(symbol)
+        if point is None:
+            if entry_price > 500: # Indices, Gold, Crypto
+                point = 0.01 # Crude assumption
+                if entry_price > 20000: # BTC
+                    point = 1.0
+            elif entry_price > 20: # Oil, etc
+                point = 0.001
+            else: # Forex
+                point = 0.00001
+            self._point_cache[symbol] = point
+        return point
 
-    def compute_indicators(self, df: pd.DataFrame):
+    def _compute_all(self, close: np.ndarray, high: np.ndarray, low: np.ndarray):
+        """
+        Compute (rsi, rsi_wma, rsi_ema, adx) arrays from raw float64 price arrays.
         """
-        Compute RSI, WMA(RSI), EMA(RSI) for a dataframe.
+        rsi, rsi_wma, rsi_ema = indicators.rsi_wma_ema_bundle(close, self._rsi_period, self._wma_period, self._ema_period)
+        adx = indicators.adx_np(high, low, close, self._adx_period)
+        return rsi, rsi_wma, rsi_ema, adx
+
+    def compute_indicators(self, df: pd.DataFrame, key=None):
         """
-        if df.empty:
+        Compute RSI, WMA(RSI), EMA(RSI) and ADX for a dataframe (stored as INDICATOR_DTYPE).
+        With a key (e.g. (symbol, timeframe)) the streaming state and output of the previous
+        call are kept: if df is that frame slid forward, only its new bars are computed.
+        Keyed frames must only contain closed bars.
+        """
+        if len(df) == 0:
             return df
+
+        if key is not None:
+            cached = self._ind_cache.get(key)
+            values = self._extend_cached(df, key, *cached) if cached is not None else None
+            if values is not None:
+                df[INDICATOR_COLUMNS] = values
+                return df
+            # No usable cache: full pass, keeping the state if the frame is long enough to seed it
+            state = self.seed_state(df)
+            if state is not None:
+                self._ind_cache[key] = (state, df['time'].to_numpy(), df[INDICATOR_COLUMNS].to_numpy())
+                return df
+            self._ind_cache.pop(key, None)
             
-        df['rsi'] = indicators.rsi(df['close'], self.config['rsi_period'])
-        df['rsi_wma'] = indicators.wma(df['rsi'], self.config['wma_period'])
-        df['rsi_ema'] = indicators.ema(df['rsi'], self.config['ema_period'])
-        
-        # Compute ADX if configured
-        adx_period = self.config.get('adx_period', 14)
-        df['adx'] = indicators.adx(df['high'], df['low'], df['close'], adx_period)
+        close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        high = df['high'].to_numpy(dtype=np.float64, copy=False)
+        low = df['low'].to_numpy(dtype=np.float64, copy=False)
+        df[INDICATOR_COLUMNS] = np.column_stack(self._compute_all(close, high, low)).astype(INDICATOR_DTYPE)
         return df
 
-    def generate(self, df3: pd.DataFrame, df2: pd.DataFrame, df1: pd.DataFrame, symbol: str, point: float = None) -> Signal:
+    def _extend_cached(self, df: pd.DataFrame, key, state: 'IndicatorState', prev_time: np.ndarray, prev_values: np.ndarray):
         """
-        Generate signal based on 3-TF logic.
+        Indicator values for df reusing the cached rows it shares with the previous frame,
+        or None if df does not line up with it (gap, reload, different history).
         """
-        # Ensure we have enough data
-        if df3.empty or df2.empty or df1.empty:
+        time = df['time'].to_numpy()
+        j = np.searchsorted(prev_time, time[0])
+        if j >= len(prev_time) or prev_time[j] != time[0]:
+            return None
+        overlap = len(prev_time) - j
+        close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        if (overlap > len(time) or time[overlap - 1] != prev_time[-1]
+                or close[overlap - 1] != state.last_close):
             return None
-            
-        # --- ADX Filter (TF1) ---
-        # Check if trend is strong enough on execution timeframe
-        curr1 = df1.iloc[-1]
-        adx_threshold = self.config.get('adx_threshold', 25)
-        
-        # Check if ADX column exists (might be NaN at start)
-        if 'adx' in curr1 and not pd.isna(curr1['adx']):
-            if curr1['adx'] < adx_threshold:
-                # Market is chopping
-                return None
-        # ------------------------
-            
-        # 1. Bias Check (TF3)
-        # Use last closed candle (iloc[-1] if we assume df contains closed candles, 
-        # but usually get_candles returns current open candle at end. 
-        # Let's assume we use iloc[-2] for fully closed, or check timestamps.)
-        # For simplicity, let's use iloc[-1] assuming it's the latest relevant candle 
-        # (user spec says "wait for TF1 close", so TF1[-1] is closed).
-        # But for TF3/TF2, they might be still open. We should use the latest available data or strictly closed.
-        # Let's use latest available (iloc[-1]) for Trend/Zone to be reactive, 
-        # but strictly closed for TF1 confirmation.
-        
-        curr3 = df3.iloc[-1]
-        bias = None
-        
-        # Bias Logic
-        if curr3['rsi'] >= self.config['bias_rsi_threshold_high'] or curr3['rsi'] > curr3['rsi_wma']: 
-            # Note: User spec: "rsi_TF3 >= rsi_upper OR wma45_rsi_TF3 > threshold" -> This seems slightly ambiguous in spec.
-            # Spec says: "If rsi_TF3 >= rsi_upper OR wma45_rsi_TF3 > threshold => BIAS=LONG"
-            # Wait, usually WMA > threshold? Or RSI > WMA?
-            # Handbook says: Uptrend if RSI > 40 and WMA sloping up.
-            # Spec says: "If rsi_TF3 >= rsi_upper OR wma45_rsi_TF3 > threshold"
-            # Let's interpret as: RSI >= 75 OR (RSI > 50 and WMA > 50) - let's stick to the spec text literally if possible, 
-            # but "wma45_rsi_TF3 > threshold" implies checking WMA value.
-            # Let's use: RSI > WMA45 as general uptrend bias from Handbook.
-            bias = 'LONG' if curr3['rsi'] > curr3['rsi_wma'] else 'SHORT'
-        
-        # Refined Bias from Spec:
-        # If rsi_TF3 >= rsi_upper (75) => LONG
-        # If rsi_TF3 <= rsi_lower (25) => SHORT
-        # If not extreme, check Trend?
-        # Let's combine:
-        if curr3['rsi'] >= self.config['rsi_upper']:
-            bias = 'LONG'
-        elif curr3['rsi'] <= self.config['rsi_lower']:
-            bias = 'SHORT'
-        else:
-            # Fallback to RSI vs WMA
-            bias = 'LONG' if curr3['rsi'] > curr3['rsi_wma'] else 'SHORT'
 
-        if not bias:
+        values = np.empty((len(time), len(INDICATOR_COLUMNS)), dtype=INDICATOR_DTYPE)
+        values[:overlap] = prev_values[j:]
+        if len(time) > overlap:
+            high = df['high'].to_numpy(dtype=np.float64, copy=False)
+            low = df['low'].to_numpy(dtype=np.float64, copy=False)
+            values[overlap:] = self._advance(state, close[overlap:], high[overlap:], low[overlap:])
+            state.last_time = time[-1]
+        self._ind_cache[key] = (state, time, values)
+        return values
+
+    def seed_state(self, df: pd.DataFrame) -> IndicatorState:
+        """
+        Compute indicators on df (adding the columns) and return the streaming state after its
+        last row. Returns None if df is too short for every indicator to be warmed up.
+        """
+        rsi_p = self._rsi_period
+        wma_p = self._wma_period
+        adx_p = self._adx_period
+        if len(df) < max(rsi_p + wma_p, 2 * adx_p):
             return None
 
-        # 2. Entry Zone (TF2)
-        curr2 = df2.iloc[-1]
-        in_zone = False
-        
-        if bias == 'LONG':
-            # Near WMA45 or RSI in [40..55]
-            dist = abs(curr2['rsi'] - curr2['rsi_wma'])
-            if dist <= self.config['tf2_zone_tolerance'] or (40 <= curr2['rsi'] <= 55):
-                in_zone = True
-        else: # SHORT
-            # Near WMA45 or RSI in [45..60] (Symmetric)
-            dist = abs(curr2['rsi'] - curr2['rsi_wma'])
-            if dist <= self.config['tf2_zone_tolerance'] or (45 <= curr2['rsi'] <= 60):
-                in_zone = True
-                
-        if not in_zone:
+        close = df['close'].to_numpy(dtype=np.float64, copy=False)
+        high = df['high'].to_numpy(dtype=np.float64, copy=False)
+        low = df['low'].to_numpy(dtype=np.float64, copy=False)
+
+        (rsi, rsi_wma, rsi_ema), (avg_gain, avg_loss) = indicators.rsi_wma_ema_bundle(
+            close, rsi_p, wma_p, self._ema_period, return_state=True)
+        adx, (trs, pdms, mdms, adx_val) = indicators.adx_np(high, low, close, adx_p, return_state=True)
+        df[INDICATOR_COLUMNS] = np.column_stack((rsi, rsi_wma, rsi_ema, adx)).astype(INDICATOR_DTYPE)
+
+        ring = rsi[-wma_p:].copy()
+        return IndicatorState(
+            last_time=df['time'].iat[-1],
+            last_close=close[-1],
+            avg_gain=avg_gain,
+            avg_loss=avg_loss,
+            ema_prev=rsi_ema[-1],
+            wma_ring=ring,
+            wma_idx=0,
+            wma_sum=ring.sum(),
+            wma_wsum=np.dot(ring, np.arange(1, wma_p + 1)),
+            adx_state=(high[-1], low[-1], trs, pdms, mdms, adx_val),
+        )
+
+    def update(self, df_tail: pd.DataFrame, state: IndicatorState) -> pd.DataFrame:
+        """
+        Advance state by the new bar(s) in df_tail (normally just the newest closed row)
+        in O(1) per bar. Returns df_tail with the indicator columns filled in.
+        """
+        close = df_tail['close'].to_numpy(dtype=np.float64, copy=False)
+        high = df_tail['high'].to_numpy(dtype=np.float64, copy=False)
+        low = df_tail['low'].to_numpy(dtype=np.float64, copy=False)
+        out = self._advance(state, close, high, low)
+        if len(df_tail):
+            state.last_time = df_tail['time'].iat[-1]
+
+        df_tail = df_tail.copy()
+        df_tail[INDICATOR_COLUMNS] = out.astype(INDICATOR_DTYPE)
+        return df_tail
+
+    def _advance(self, state: IndicatorState, close: np.ndarray, high: np.ndarray, low: np.ndarray) -> np.ndarray:
+        """
+        Advance state over the given bars; returns their (rsi, rsi_wma, rsi_ema, adx) rows.
+        state.last_time is left to the caller.
+        """
+        rsi_p = self._rsi_period
+        wma_p = self._wma_period
+        adx_p = self._adx_period
+        alpha = 2.0 / (self._ema_period + 1)
+        wma_norm = wma_p * (wma_p + 1) / 2.0
+
+        out = np.empty((len(close), 4))
+
+        prev_high, prev_low, trs, pdms, mdms, adx_val = state.adx_state
+        for i in range(len(close)):
+            c, h, l = close[i], high[i], low[i]
+
+            # RSI (Wilder)
+            change = c - state.last_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            state.avg_gain = (state.avg_gain * (rsi_p - 1) + gain) / rsi_p
+            state.avg_loss = (state.avg_loss * (rsi_p - 1) + loss) / rsi_p
+            rsi = 100.0 - 100.0 / (1.0 + state.avg_gain / max(state.avg_loss, 1e-9))
+
+            # WMA(RSI): sliding weighted sum, S_new = S_old - oldest + x, W_new = W_old + n*x - S_old
+            oldest = state.wma_ring[state.wma_idx]
+            state.wma_wsum += wma_p * rsi - state.wma_sum
+            state.wma_sum += rsi - oldest
+            state.wma_ring[state.wma_idx] = rsi
+            state.wma_idx = (state.wma_idx + 1) % wma_p
+
+            # EMA(RSI)
+            state.ema_prev = alpha * rsi + (1.0 - alpha) * state.ema_prev
+
+            # ADX (Wilder sums)
+            tr = max(h - l, abs(h - state.last_close), abs(l - state.last_close))
+            up_move = h - prev_high
+            down_move = prev_low - l
+            pdm = up_move if (up_move > down_move and up_move > 0) else 0.0
+            mdm = down_move if (down_move > up_move and down_move > 0) else 0.0
+            trs = trs - trs / adx_p + tr
+            pdms = pdms - pdms / adx_p + pdm
+            mdms = mdms - mdms / adx_p + mdm
+            plus_di = 100.0 * pdms / max(trs, 1e-9)
+            minus_di = 100.0 * mdms / max(trs, 1e-9)
+            dx = 100.0 * abs(plus_di - minus_di) / max(plus_di + minus_di, 1e-9)
+            adx_val = (adx_val * (adx_p - 1) + dx) / adx_p
+
+            prev_high, prev_low = h, l
+            state.last_close = c
+            out[i] = (rsi, state.wma_wsum / wma_norm, state.ema_prev, adx_val)
+
+        state.adx_state = (prev_high, prev_low, trs, pdms, mdms, adx_val)
+        return out
+
+    def generate(self, df3: pd.DataFrame, df2: pd.DataFrame, df1: pd.DataFrame, symbol: str, point: float = None) -> Signal:
+        """
+        Generate signal based on 3-TF logic.
+        """
+        # Ensure we have enough data (TF1 needs the bar before the closed one for crossovers)
+        if len(df3) == 0 or len(df2) == 0 or len(df1) < 2:
             return None
 
-        # 3. Confirmation (TF1)
-        # Must use CLOSED candle. Assuming df1[-1] is the just-closed candle.
-        curr1 = df1.iloc[-1]
-        prev1 = df1.iloc[-2]
-        
-        confirmed = False
-        reason = ""
-        
-        if bias == 'LONG':
-            # Crossover: EMA9 crosses above WMA45
-            # Check if EMA9 was below WMA45 and now is above
-            # Or RSI crosses above WMA45
-            
-            # Spec: "EMA9_TF1 cắt WMA45_TF1 theo hướng bias"
-            ema_cross = (prev1['rsi_ema'] <= prev1['rsi_wma']) and (curr1['rsi_ema'] > curr1['rsi_wma'])
-            
-            # Spec: "OR RSI_TF1 re-test WMA45_RSI_TF1"
-            # Simple retest: RSI dropped near WMA and bounced up. 
-            # Hard to detect strictly with 1 candle. Let's stick to Crossover for MVP.
-            
-            # Also check RSI > EMA9 for strength
-            if ema_cross or ((prev1['rsi'] <= prev1['rsi_wma']) and (curr1['rsi'] > curr1['rsi_wma'])):
-                confirmed = True
-                reason = "Crossover"
-                
-        else: # SHORT
-            # Crossover: EMA9 crosses below WMA45
-            ema_cross = (prev1['rsi_ema'] >= prev1['rsi_wma']) and (curr1['rsi_ema'] < curr1['rsi_wma'])
-            
-            if ema_cross or ((prev1['rsi'] >= prev1['rsi_wma']) and (curr1['rsi'] < curr1['rsi_wma'])):
-                confirmed = True
-                reason = "Crossover"
+        return self.generate_from_arrays(TFView.from_df(df3), TFView.from_df(df2), TFView.from_df(df1), symbol, point)
 
-        if not confirmed:
+    def generate_from_arrays(self, tf3, tf2, tf1, symbol: str, point: float = None) -> Signal:
+        """
+        generate() on column arrays instead of DataFrames (e.g. for backtests).
+        Each TF is a TFView or a tuple (rsi, wma, ema, close, low, high, time[, adx]) of ndarrays.
+        """
+        v3, v2, v1 = (tf if isinstance(tf, TFView) else TFView(*tf) for tf in (tf3, tf2, tf1))
+        if len(v3.rsi) == 0 or len(v2.rsi) == 0 or len(v1.rsi) < 2:
             return None
 
-        # 4. Build Signal
-        # Calculate SL/TP
-        entry_price = curr1['close'] # Approximate execution price
-        sl_price = 0.0
-        
-        if self.config['sl_method'] == 'swing':
-            # Lookback for Swing High/Low
-            lookback = self.config['swing_lookback']
-            window = df1.iloc[-lookback:]
-            if bias == 'LONG':
-                sl_price = window['low'].min()
-            else:
-                sl_price = window['high'].max()
+        # TF3/TF2 use their latest available bar to stay reactive; TF1 is strictly closed
+        # (v1[-1] is the just-closed candle).
+        # ADX may be missing; NaN skips the filter
+        adx_val = float(v1.adx[-1]) if v1.adx is not None else np.nan
+
+        entry_price = float(v1.close[-1]) # Approximate execution price
+        swing = self._sl_is_swing
+        sl_dist = 0.0
+        swing_low = swing_high = np.nan
+        if swing:
+            tracker = self._swing.get(symbol)
+            if tracker is None:
+                tracker = self._swing[symbol] = SwingTracker(self._swing_lookback)
+            tracker.sync(v1.time, v1.low, v1.high)
+            swing_low, swing_high = tracker.min_low(), tracker.max_high()
         else:
             # Fixed Pips
             if point is None:
                 # Fallback to heuristic if point not provided
-                if entry_price > 500: # Indices, Gold, Crypto
-                    point = 0.01 # Crude assumption
-                    if entry_price > 20000: # BTC
-                        point = 1.0
-                elif entry_price > 20: # Oil, etc
-                    point = 0.001
-                else: # Forex
-                    point = 0.00001
-                
-            sl_points = self.config.get('sl_points', 500) # Default 500 points
-            sl_dist = sl_points * point
-            
-            if bias == 'LONG':
-                sl_price = entry_price - sl_dist
-            else:
-                sl_price = entry_price + sl_dist
+                point = self._fallback_point(symbol, entry_price)
+            sl_dist = self._sl_points * point
 
-        # Calculate TP
-        dist = abs(entry_price - sl_price)
-        if bias == 'LONG':
-            tp_price = entry_price + dist * self.config['tp_rr']
-        else:
-            tp_price = entry_price - dist * self.config['tp_rr']
+        side, sl_price, tp_price = _decide(
+            float(v3.rsi[-1]), float(v3.wma[-1]), float(v2.rsi[-1]), float(v2.wma[-1]),
+            v1.rsi, v1.wma, v1.ema, swing_low, swing_high, entry_price, adx_val,
+            *self._decide_args, sl_dist,
+        )
+        if side == 0:
+            return None
 
         return Signal(
             symbol=symbol,
-            side=bias,
+            side='LONG' if side > 0 else 'SHORT',
             entry_price=entry_price,
-            sl_price=sl_price,
-            tp_price=tp_price,
+            sl_price=float(sl_price),
+            tp_price=float(tp_price),
             confidence=0.8,
-            reason=reason,
-            tf1_close_time=curr1['time']
+            reason="Crossover",
+            tf1_close_time=pd.Timestamp(v1.time[-1])
         )
+
+    def generate_batch(self, symbols: list, rsi3: np.ndarray, wma3: np.ndarray, rsi2: np.ndarray, wma2: np.ndarray,
+                       rsi1: np.ndarray, wma1: np.ndarray, ema1: np.ndarray, lows: np.ndarray, highs: np.ndarray,
+                       closes: np.ndarray, adx: np.ndarray = None, points: np.ndarray = None, times=None) -> list:
+        """
+        Same decision as generate() for S symbols at once, as one vectorized pass.
+        rsi3/wma3/rsi2/wma2/closes (and optional adx/points/times): shape (S,), latest values.
+        rsi1/wma1/ema1: shape (S, 2), the TF1 bar before the closed one and the closed one.
+        lows/highs: shape (S, swing_lookback), the TF1 swing window (unused for fixed SL).
+        Returns Signals only for the symbols that trigger.
+        """
+        rsi3, wma3, rsi2, wma2, closes = (np.asarray(a, dtype=np.float64) for a in (rsi3, wma3, rsi2, wma2, closes))
+        rsi1, wma1, ema1 = (np.asarray(a, dtype=np.float64) for a in (rsi1, wma1, ema1))
+
+        # ADX filter (NaN skips it), bias, zone
+        mask = np.ones(len(symbols), dtype=bool)
+        if adx is not None:
+            mask &= ~(np.asarray(adx, dtype=np.float64) < self._adx_threshold)
+        is_long = (rsi3 >= self._rsi_upper) | ((rsi3 > wma3) & (rsi3 > self._rsi_lower))
+        zone_lo = np.where(is_long, 40.0, 45.0)
+        d2 = rsi2 - wma2
+        mask &= (d2 * d2 <= self._zone_tol2) | ((zone_lo <= rsi2) & (rsi2 <= zone_lo + 15.0))
+
+        # Crossovers in the bias direction: (x - wma) * direction goes from <= 0 to > 0
+        direction = np.where(is_long, 1.0, -1.0)
+        de = (ema1 - wma1) * direction[:, None]
+        dr = (rsi1 - wma1) * direction[:, None]
+        mask &= ((de[:, 0] <= 0) & (de[:, 1] > 0)) | ((dr[:, 0] <= 0) & (dr[:, 1] > 0))
+
+        hits = np.flatnonzero(mask)
+        if hits.size == 0:
+            return []
+
+        # SL/TP only for the symbols that triggered
+        d = direction[hits]
+        entry = closes[hits]
+        if self._sl_is_swing:
+            sl = np.where(is_long[hits], np.asarray(lows, dtype=np.float64)[hits].min(axis=1),
+                          np.asarray(highs, dtype=np.float64)[hits].max(axis=1))
+        else:
+            if points is None:
+                pt = np.array([self._fallback_point(symbols[i], closes[i]) for i in hits])
+            else:
+                pt = np.asarray(points, dtype=np.float64)[hits]
+            sl = entry - d * self._sl_points * pt
+        tp = entry + d * np.abs(entry - sl) * self._tp_rr
+
+        return [
+            Signal(
+                symbol=symbols[i],
+                side='LONG' if d[k] > 0 else 'SHORT',
+                entry_price=float(entry[k]),
+                sl_price=float(sl[k]),
+                tp_price=float(tp[k]),
+                confidence=0.8,
+                reason="Crossover",
+                tf1_close_time=None if times is None else pd.Timestamp(times[i])
+            )
+            for k, i in enumerate(hits)
+        ]
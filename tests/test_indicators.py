@@ -1,11 +1,15 @@
 import unittest
 import pandas as pd
 import numpy as np
-from indicators import rsi, wma, ema
+import indicators
+from indicators import rsi, wma, ema, adx
 
 class TestIndicators(unittest.TestCase):
-    def setUp(self):
-        self.data = pd.Series(np.random.randn(100) + 100) # Random price data
+    @classmethod
+    def setUpClass(cls):
+        # Seeded price data, built once and only read by the tests
+        rng = np.random.default_rng(0)
+        cls.data = pd.Series(rng.standard_normal(100) + 100)
 
     def test_ema(self):
         result = ema(self.data, 9)
@@ -22,9 +26,45 @@ class TestIndicators(unittest.TestCase):
     def test_rsi(self):
         result = rsi(self.data, 14)
         self.assertEqual(len(result), 100)
+        # Wilder seed: first 14 should be NaN
+        self.assertTrue(np.isnan(result.iloc[13]))
+        self.assertFalse(np.isnan(result.iloc[14]))
         # Drop NaNs before checking range
         valid_result = result.dropna()
         self.assertTrue((valid_result >= 0).all() and (valid_result <= 100).all())
 
+    def test_adx(self):
+        high = self.data + 0.5
+        low = self.data - 0.5
+        result = adx(high, low, self.data, 14)
+        self.assertEqual(len(result), 100)
+        # First ADX needs 2*period-1 bars
+        self.assertTrue(np.isnan(result.iloc[26]))
+        self.assertFalse(np.isnan(result.iloc[27]))
+        valid_result = result.dropna()
+        self.assertTrue((valid_result >= 0).all() and (valid_result <= 100).all())
+
+    def test_rsi14_matches_generic_kernel(self):
+        arr = self.data.to_numpy()
+        generic = np.full(len(arr), np.nan)
+        indicators._rsi_wilder(arr, 14, generic)
+        np.testing.assert_allclose(rsi(self.data, 14).to_numpy(), generic)
+
+    def test_bundle_matches_separate_indicators(self):
+        close = self.data.to_numpy()
+        r, w, e = indicators.rsi_wma_ema_bundle(close, 14, 45, 9)
+        np.testing.assert_allclose(r, rsi(self.data, 14).to_numpy())
+        np.testing.assert_allclose(w, wma(rsi(self.data, 14), 45).to_numpy())
+        np.testing.assert_allclose(e, ema(rsi(self.data, 14), 9).to_numpy())
+
+    def test_lfilter_fallback_matches_kernels(self):
+        high = self.data + 0.5
+        low = self.data - 0.5
+        np.testing.assert_allclose(
+            indicators._rsi_lfilter(self.data.to_numpy(), 14)[0], rsi(self.data, 14).to_numpy())
+        np.testing.assert_allclose(
+            indicators._adx_lfilter(high.to_numpy(), low.to_numpy(), self.data.to_numpy(), 14)[0],
+            adx(high, low, self.data, 14).to_numpy())
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import MagicMock
+from collections import namedtuple
 from datetime import datetime
-from risk_manager import RiskManager
+from risk_manager import RiskManager, SYNC_OVERLAP
+
+# Subset of MT5's TradeDeal fields used by the risk sync
+Deal = namedtuple('Deal', ['ticket', 'profit', 'swap', 'commission', 'time'])
 
 class TestRiskManagerSync(unittest.TestCase):
     def setUp(self):
@@ -19,9 +23,9 @@ class TestRiskManagerSync(unittest.TestCase):
         # Consecutive losses: Win, Loss, Loss => 2
         
         deals = [
-            {'profit': 100.0, 'swap': 0.0, 'commission': 0.0, 'time': 1000},
-            {'profit': -50.0, 'swap': 0.0, 'commission': 0.0, 'time': 2000},
-            {'profit': -60.0, 'swap': 0.0, 'commission': 0.0, 'time': 3000}
+            Deal(ticket=1, profit=100.0, swap=0.0, commission=0.0, time=1000),
+            Deal(ticket=2, profit=-50.0, swap=0.0, commission=0.0, time=2000),
+            Deal(ticket=3, profit=-60.0, swap=0.0, commission=0.0, time=3000)
         ]
         self.mt5.get_history_deals.return_value = deals
         
@@ -34,8 +38,8 @@ class TestRiskManagerSync(unittest.TestCase):
         # Profit: +100, -50 => Net: +50
         # Daily loss should be 0
         deals = [
-            {'profit': 100.0, 'swap': 0.0, 'commission': 0.0},
-            {'profit': -50.0, 'swap': 0.0, 'commission': 0.0}
+            Deal(ticket=1, profit=100.0, swap=0.0, commission=0.0, time=0),
+            Deal(ticket=2, profit=-50.0, swap=0.0, commission=0.0, time=0)
         ]
         self.mt5.get_history_deals.return_value = deals
         
@@ -43,5 +47,44 @@ class TestRiskManagerSync(unittest.TestCase):
         
         self.assertEqual(self.risk_manager.daily_loss, 0.0)
 
+    def test_sync_daily_stats_incremental(self):
+        # Second sync re-reads the overlap: ticket 2 is already counted, ticket 3 is new
+        self.mt5.get_history_deals.return_value = [
+            Deal(ticket=1, profit=100.0, swap=0.0, commission=0.0, time=0),
+            Deal(ticket=2, profit=-50.0, swap=0.0, commission=0.0, time=0)
+        ]
+        self.risk_manager.sync_daily_stats()
+        first_to = self.mt5.get_history_deals.call_args[0][1]
+
+        self.mt5.get_history_deals.return_value = [
+            Deal(ticket=2, profit=-50.0, swap=0.0, commission=0.0, time=0),
+            Deal(ticket=3, profit=-80.0, swap=0.0, commission=0.0, time=0)
+        ]
+        self.risk_manager.sync_daily_stats()
+        second_from = self.mt5.get_history_deals.call_args[0][0]
+
+        day_start = first_to.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.assertEqual(second_from, max(day_start, first_to - SYNC_OVERLAP))
+        self.assertEqual(self.risk_manager.daily_loss, 30.0)
+        self.assertEqual(self.risk_manager.consecutive_losses, 2)
+
+    def test_sync_daily_stats_failed_query_keeps_cursor(self):
+        # The second query fails; the third must re-read from the first sync's time and count ticket 2
+        self.mt5.get_history_deals.side_effect = [
+            [Deal(ticket=1, profit=100.0, swap=0.0, commission=0.0, time=0)],
+            None,
+            [Deal(ticket=2, profit=-150.0, swap=0.0, commission=0.0, time=0)],
+        ]
+        self.risk_manager.sync_daily_stats()
+        first_to = self.mt5.get_history_deals.call_args[0][1]
+        self.risk_manager.sync_daily_stats()
+        self.risk_manager.sync_daily_stats()
+        third_from = self.mt5.get_history_deals.call_args[0][0]
+
+        day_start = first_to.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.assertEqual(third_from, max(day_start, first_to - SYNC_OVERLAP))
+        self.assertEqual(self.risk_manager.daily_loss, 50.0)
+        self.assertEqual(self.risk_manager.consecutive_losses, 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
 import unittest
 import pandas as pd
 import numpy as np
-from signal_engine import SignalEngine, Signal
+import indicators
+from signal_engine import SignalEngine, Signal, SwingTracker
 
 class TestSignalEngine(unittest.TestCase):
     def setUp(self):
@@ -20,56 +21,135 @@ class TestSignalEngine(unittest.TestCase):
         }
         self.engine = SignalEngine(self.config)
 
-    def create_mock_df(self, rsi_val, wma_val, ema_val, close_val=100):
-        # Create a DF with enough rows, setting the last row to desired values
+    def _mk(self, rsi_pair, wma_pair, ema_pair, close=100):
+        # Minimal 2-row frame: the bar before the closed one and the closed one (indicators mocked)
+        cols = np.array([rsi_pair, wma_pair, ema_pair, [close] * 2, [close - 1] * 2, [close + 1] * 2], dtype=float)
+        df = pd.DataFrame(cols.T, columns=['rsi', 'rsi_wma', 'rsi_ema', 'close', 'low', 'high'])
+        df['time'] = np.array(['2023-01-01T00:00', '2023-01-01T01:00'], dtype='datetime64[ns]')
+        return df
+
+    def test_compute_indicators(self):
+        close = pd.Series(np.cumsum(np.random.default_rng(0).standard_normal(200)) + 100)
+        df = pd.DataFrame({'close': close, 'high': close + 0.5, 'low': close - 0.5})
+        df = self.engine.compute_indicators(df)
+        
+        # Stored as float32, so compare at float32 precision
+        self.assertTrue((df[['rsi', 'rsi_wma', 'rsi_ema', 'adx']].dtypes == np.float32).all())
+        expected_rsi = indicators.rsi(close, 14)
+        np.testing.assert_allclose(df['rsi'], expected_rsi, rtol=1e-6)
+        np.testing.assert_allclose(df['rsi_wma'], indicators.wma(expected_rsi, 45), rtol=1e-6)
+        np.testing.assert_allclose(df['rsi_ema'], indicators.ema(expected_rsi, 9), rtol=1e-6)
+        np.testing.assert_allclose(df['adx'], indicators.adx(df['high'], df['low'], close, 14), rtol=1e-6)
+
+    def test_streaming_update_matches_batch(self):
+        close = pd.Series(np.cumsum(np.random.default_rng(1).standard_normal(150)) + 100)
         df = pd.DataFrame({
-            'close': [close_val] * 50,
-            'time': pd.date_range(start='2023-01-01', periods=50, freq='H')
+            'close': close, 'high': close + 0.5, 'low': close - 0.5,
+            'time': pd.date_range(start='2023-01-01', periods=150, freq='h')
         })
-        # Mock indicators directly to avoid calculation logic in test
-        df['rsi'] = rsi_val
-        df['rsi_wma'] = wma_val
-        df['rsi_ema'] = ema_val
+        expected = self.engine.compute_indicators(df.copy())
         
-        # For swing low/high
-        df['low'] = close_val - 1
-        df['high'] = close_val + 1
+        state = self.engine.seed_state(df.iloc[:100].copy())
+        rows = [self.engine.update(df.iloc[i:i + 1], state) for i in range(100, 150)]
+        streamed = pd.concat(rows)
         
-        return df
+        cols = ['rsi', 'rsi_wma', 'rsi_ema', 'adx']
+        np.testing.assert_allclose(streamed[cols], expected[cols].iloc[100:], rtol=1e-6)
+        self.assertEqual(state.last_time, df['time'].iat[-1])
+
+    def test_keyed_compute_extends_cached_frame(self):
+        close = pd.Series(np.cumsum(np.random.default_rng(3).standard_normal(160)) + 100)
+        df = pd.DataFrame({
+            'close': close, 'high': close + 0.5, 'low': close - 0.5,
+            'time': pd.date_range(start='2023-01-01', periods=160, freq='h')
+        })
+        expected = self.engine.compute_indicators(df.copy())
+
+        # 100-bar windows sliding one bar at a time continue the first window's history
+        for end in range(100, 161):
+            window = self.engine.compute_indicators(df.iloc[end - 100:end].copy(), key=('TEST', 'M15'))
+        cols = ['rsi', 'rsi_wma', 'rsi_ema', 'adx']
+        np.testing.assert_allclose(window[cols].iloc[-60:], expected[cols].iloc[-60:], rtol=1e-6)
+
+    def test_swing_tracker_matches_window(self):
+        rng = np.random.default_rng(2)
+        time = np.arange(200)
+        low = rng.uniform(0, 1, 200)
+        high = rng.uniform(1, 2, 200)
+        tracker = SwingTracker(5)
+        # Sliding 50-bar frames, one new bar each
+        for end in range(50, 200):
+            tracker.sync(time[end - 50:end], low[end - 50:end], high[end - 50:end])
+            self.assertEqual(tracker.min_low(), low[end - 5:end].min())
+            self.assertEqual(tracker.max_high(), high[end - 5:end].max())
 
     def test_generate_long_signal(self):
-        # TF3: Bias LONG (RSI > 75)
-        df3 = self.create_mock_df(rsi_val=80, wma_val=50, ema_val=50)
-        
-        # TF2: In Zone (RSI near WMA)
-        df2 = self.create_mock_df(rsi_val=50, wma_val=50, ema_val=50)
-        
+        # TF3: Bias LONG (RSI > 75); TF2: In Zone (RSI near WMA)
+        df3 = self._mk([80, 80], [50, 50], [50, 50])
+        df2 = self._mk([50, 50], [50, 50], [50, 50])
         # TF1: Confirmation (Crossover: Prev EMA < WMA, Curr EMA > WMA)
-        df1 = self.create_mock_df(rsi_val=50, wma_val=50, ema_val=51)
-        # Manually set prev row for crossover
-        df1.iloc[-2, df1.columns.get_loc('rsi_ema')] = 49
-        df1.iloc[-2, df1.columns.get_loc('rsi_wma')] = 50
+        df1 = self._mk([50, 50], [50, 50], [49, 51])
         
         signal = self.engine.generate(df3, df2, df1, "TEST")
         
         self.assertIsNotNone(signal)
         self.assertEqual(signal.side, 'LONG')
         self.assertEqual(signal.symbol, 'TEST')
+        # Fewer TF1 bars than swing_lookback: the swing SL uses the bars available
+        self.assertEqual(signal.sl_price, 99.0)
+        self.assertEqual(signal.tp_price, 101.5)
 
     def test_no_signal_bias_short(self):
-        # TF3: Bias SHORT (RSI < 25)
-        df3 = self.create_mock_df(rsi_val=20, wma_val=50, ema_val=50)
-        
-        # TF2: In Zone
-        df2 = self.create_mock_df(rsi_val=50, wma_val=50, ema_val=50)
-        
+        # TF3: Bias SHORT (RSI < 25); TF2: In Zone
+        df3 = self._mk([20, 20], [50, 50], [50, 50])
+        df2 = self._mk([50, 50], [50, 50], [50, 50])
         # TF1: Long Crossover (Should be ignored because Bias is SHORT)
-        df1 = self.create_mock_df(rsi_val=50, wma_val=50, ema_val=51)
-        df1.iloc[-2, df1.columns.get_loc('rsi_ema')] = 49
-        df1.iloc[-2, df1.columns.get_loc('rsi_wma')] = 50
+        df1 = self._mk([50, 50], [50, 50], [49, 51])
         
         signal = self.engine.generate(df3, df2, df1, "TEST")
         self.assertIsNone(signal)
 
+    def test_short_frames(self):
+        df3 = self._mk([80, 80], [50, 50], [50, 50])
+        df2 = self._mk([50, 50], [50, 50], [50, 50])
+        df1 = self._mk([50, 50], [50, 50], [49, 51])
+
+        # No bar before the closed one: no crossover to test
+        self.assertIsNone(self.engine.generate(df3, df2, df1.iloc[-1:], "TEST"))
+        self.assertIsNone(self.engine.generate(df3.iloc[:0], df2, df1, "TEST"))
+
+    def test_generate_from_arrays(self):
+        n = 10
+        time = np.datetime64('2023-01-01T00:00', 'ns') + np.arange(n) * np.timedelta64(1, 'h')
+        close, high = np.full(n, 100.0), np.full(n, 101.0)
+        # Swing SL is the lowest low of the last swing_lookback (5) bars only
+        low = np.full(n, 99.0)
+        low[-3] = 98.0
+        low[-10] = 90.0
+        def tf(rsi_pair, wma_pair, ema_pair):
+            return tuple(np.concatenate((np.full(n - 2, float(p[0])), p)) for p in (rsi_pair, wma_pair, ema_pair)) + (
+                close, low, high, time)
+
+        signal = self.engine.generate_from_arrays(
+            tf([80, 80], [50, 50], [50, 50]), tf([50, 50], [50, 50], [50, 50]), tf([50, 50], [50, 50], [49, 51]), "TEST")
+        self.assertIsNotNone(signal)
+        self.assertEqual(signal.side, 'LONG')
+        self.assertEqual(signal.sl_price, 98.0)
+        self.assertEqual(signal.tp_price, 103.0)
+        self.assertEqual(signal.tf1_close_time, pd.Timestamp('2023-01-01 09:00'))
+
+    def test_generate_batch(self):
+        # TEST1: LONG bias + in zone + EMA crossover; TEST2: same TF1 crossover but SHORT bias
+        signals = self.engine.generate_batch(
+            ['TEST1', 'TEST2'],
+            rsi3=[80, 20], wma3=[50, 50], rsi2=[50, 50], wma2=[50, 50],
+            rsi1=[[50, 50], [50, 50]], wma1=[[50, 50], [50, 50]], ema1=[[49, 51], [49, 51]],
+            lows=np.full((2, 5), 99.0), highs=np.full((2, 5), 101.0), closes=[100, 100],
+        )
+        self.assertEqual([s.symbol for s in signals], ['TEST1'])
+        self.assertEqual(signals[0].side, 'LONG')
+        self.assertEqual(signals[0].sl_price, 99.0)
+        self.assertEqual(signals[0].tp_price, 101.5)
+
 if __name__ == '__main__':
     unittest.main()